@@ -3,8 +3,6 @@ CLI entry point for TermPipe MCP.
 """
 
 import sys
-import argparse
-from pathlib import Path
 
 
 def setup_command(reset: bool = False):
@@ -79,12 +77,12 @@ def server_command():
 
 def status_command():
     """Check server status"""
-    import httpx
-    from termpipe_mcp.helpers import TERMCP_URL
-    
     print("🔍 Checking TermPipe MCP status...")
     print()
     
+    import httpx
+    from termpipe_mcp.helpers.constants import TERMCP_URL
+    
     try:
         response = httpx.get(f"{TERMCP_URL}/health", timeout=5.0)
         if response.status_code == 200:
@@ -112,40 +110,58 @@ def status_command():
         return 1
 
 
+_USAGE = """usage: termcp [-h] {setup,server,status} ...
+
+TermPipe MCP Server - FastAPI backend for MCP clients (Claude Desktop, iFlow CLI, Gemini CLI, etc.)
+
+commands:
+  setup [--reset]   Configure API credentials
+                    (--reset: force re-probe provider detection)
+  server            Start the FastAPI server
+  status            Check server status
+
+options:
+  -h, --help        show this help message and exit
+"""
+
+# command -> accepted flags
+_COMMANDS = {
+    "setup": ("--reset",),
+    "server": (),
+    "status": (),
+}
+
+
+def _usage_error(message: str):
+    print(_USAGE.split("\n\n")[0], file=sys.stderr)
+    print(f"termcp: error: {message}", file=sys.stderr)
+    sys.exit(2)
+
+
 def main():
     """Main CLI entry point"""
-    parser = argparse.ArgumentParser(
-        prog="termcp",
-        description="TermPipe MCP Server - FastAPI backend for MCP clients (Claude Desktop, iFlow CLI, Gemini CLI, etc.)"
-    )
-    
-    subparsers = parser.add_subparsers(dest="command", help="Command to run")
-    
-    # Setup command
-    setup_parser = subparsers.add_parser("setup", help="Configure API credentials")
-    setup_parser.add_argument("--reset", action="store_true", help="Force re-probe provider detection")
-    
-    # Server command
-    subparsers.add_parser("server", help="Start the FastAPI server")
+    argv = sys.argv[1:]
     
-    # Status command
-    subparsers.add_parser("status", help="Check server status")
-    
-    args = parser.parse_args()
-    
-    if not args.command:
-        parser.print_help()
+    if not argv:
+        print(_USAGE)
         sys.exit(1)
+    if "-h" in argv or "--help" in argv:
+        print(_USAGE)
+        sys.exit(0)
     
-    if args.command == "setup":
-        setup_command(reset=getattr(args, "reset", False))
-    elif args.command == "server":
+    command, flags = argv[0], argv[1:]
+    if command not in _COMMANDS:
+        _usage_error(f"invalid choice: {command!r} (choose from {', '.join(map(repr, _COMMANDS))})")
+    unknown = [f for f in flags if f not in _COMMANDS[command]]
+    if unknown:
+        _usage_error(f"unrecognized arguments: {' '.join(unknown)}")
+    
+    if command == "setup":
+        setup_command(reset="--reset" in flags)
+    elif command == "server":
         server_command()
-    elif args.command == "status":
+    elif command == "status":
         sys.exit(status_command())
-    else:
-        parser.print_help()
-        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -3,10 +3,22 @@ Configuration management for TermPipe MCP Server.
 """
 
 import json
+import os
 from pathlib import Path
 from termpipe_mcp.helpers import get_config_dir
 from typing import Optional, Dict, Any
 
+# iFlow CLI files get_iflow_credentials falls back to
+IFLOW_SETTINGS = Path.home() / ".iflow" / "settings.json"
+IFLOW_OAUTH = Path.home() / ".iflow" / "oauth_creds.json"
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
 
 class Config:
     """Manages TermPipe MCP configuration"""
@@ -16,20 +28,36 @@ class Config:
         self.config_file = self.config_dir / "config.json"
         self.log_file = self.config_dir / "server.log"
         self._config: Optional[Dict[str, Any]] = None
+        self._mtime: Optional[int] = None
+        self._dir_ready = False
     
     def ensure_dir(self):
-        """Ensure configuration directory exists"""
+        """Ensure configuration directory exists (once per process)"""
+        if self._dir_ready:
+            return
         self.config_dir.mkdir(parents=True, exist_ok=True)
         self.config_dir.chmod(0o700)
+        self._dir_ready = True
+    
+    def _stat_mtime(self) -> Optional[int]:
+        return _mtime_ns(self.config_file)
+    
+    def credentials_stamp(self) -> tuple[Optional[int], ...]:
+        """
+        mtimes (None when missing) of every file get_iflow_credentials reads;
+        it changes whenever the credentials it would return can.
+        """
+        return tuple(_mtime_ns(p) for p in (self.config_file, IFLOW_SETTINGS, IFLOW_OAUTH))
     
     def load(self) -> Dict[str, Any]:
-        """Load configuration from file"""
-        if self._config is not None:
+        """Load configuration from file (cached until the file changes)"""
+        mtime = self._stat_mtime()
+        if self._config is not None and mtime == self._mtime:
             return self._config
         
         self.ensure_dir()
         
-        if not self.config_file.exists():
+        if mtime is None:
             # Create default config
             default = {
                 "api_key": "",
@@ -44,17 +72,21 @@ class Config:
         try:
             with open(self.config_file) as f:
                 self._config = json.load(f)
+            self._mtime = mtime
             return self._config
         except Exception as e:
             raise RuntimeError(f"Failed to load config: {e}")
     
     def save(self, config: Dict[str, Any]):
-        """Save configuration to file"""
+        """Save configuration to file (atomic tmp + rename)"""
         self.ensure_dir()
-        with open(self.config_file, 'w') as f:
+        tmp = self.config_file.with_suffix(".json.tmp")
+        with open(tmp, 'w') as f:
+            os.fchmod(f.fileno(), 0o600)
             json.dump(config, f, indent=2)
-        self.config_file.chmod(0o600)
+        os.replace(tmp, self.config_file)
         self._config = config
+        self._mtime = self._stat_mtime()
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value"""
@@ -69,21 +101,39 @@ class Config:
     
     def get_iflow_credentials(self) -> tuple[str, str]:
         """Get iFlow API credentials"""
-        api_key = self.get("api_key")
-        api_base = self.get("api_base", "https://apis.iflow.cn/v1")
+        # Read-only lookup: a missing config.json isn't created here, and an
+        # unreadable one just moves on to the ~/.iflow fallbacks
+        try:
+            cfg = self.load() if self._stat_mtime() is not None else {}
+        except RuntimeError:
+            cfg = {}
+        if not isinstance(cfg, dict):
+            cfg = {}
+        api_key = cfg.get("api_key")
+        api_base = cfg.get("api_base", "https://apis.iflow.cn/v1")
         
         if not api_key:
             # Try fallback to main iFlow settings
-            iflow_settings = Path.home() / ".iflow" / "settings.json"
-            if iflow_settings.exists():
+            if IFLOW_SETTINGS.exists():
                 try:
-                    with open(iflow_settings) as f:
+                    with open(IFLOW_SETTINGS) as f:
                         settings = json.load(f)
                     api_key = settings.get("apiKey", "")
                     api_base = settings.get("baseUrl", api_base)
                 except Exception:
                     pass
         
+        if not api_key:
+            # Try iFlow OAuth credentials
+            if IFLOW_OAUTH.exists():
+                try:
+                    with open(IFLOW_OAUTH) as f:
+                        oauth = json.load(f)
+                    api_key = oauth.get("apiKey", "")
+                    api_base = "https://apis.iflow.cn/v1"  # Default for OAuth
+                except Exception:
+                    pass
+        
         if not api_key:
             raise ValueError(
                 "No API key configured. Run 'termcp setup' or set api_key in "
@@ -3,15 +3,17 @@ TermPipe FastAPI Server - Minimal backend for MCP command execution and NLP.
 """
 
 import asyncio
-import subprocess
 import time
 import os
+import re
 import shlex
 from typing import Optional, List, Dict, Any
-from datetime import datetime
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
-from fastapi import FastAPI
+import httpx
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
@@ -54,27 +56,115 @@ class HealthResponse(BaseModel):
     version: str = "2.0.0"
 
 
+# =============================================================================
+# NLP Prompt
+# =============================================================================
+
+_SYSTEM_PROMPT = """You are a Linux shell command expert. Convert natural language queries to precise shell commands.
+Rules:
+- Output ONLY the command, no explanation
+- Use standard Linux utilities (ls, grep, find, awk, sed, etc.)
+- Prioritize readability and safety
+- Use absolute paths when possible
+"""
+
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+
+# Markdown code fence around the model's answer: ```lang\n...\n```
+_FENCE_RE = re.compile(r"^```[^\n]*\n(.*?)\n```\s*$", re.DOTALL)
+
+# Static portion of the chat-completions body
+_BASE_BODY = {"temperature": 0.1, "max_tokens": 500}
+
+
+@lru_cache(maxsize=1)
+def _get_model() -> str:
+    """Model used for NLP translation (read once; restart to pick up changes)."""
+    return config.get("default_model", "qwen3-coder-plus")
+
+
+# =============================================================================
+# Subprocess Output
+# =============================================================================
+
+# Per-stream cap on captured output; the rest is read and discarded
+MAX_OUTPUT_BYTES = int(os.environ.get("TERMPIPE_MAX_OUTPUT_BYTES", 1 << 20))
+
+
+async def _drain(stream: asyncio.StreamReader, cap: int = MAX_OUTPUT_BYTES) -> bytes:
+    """Read a pipe to EOF, keeping at most `cap` bytes (so the child never blocks)."""
+    buf = bytearray()
+    dropped = 0
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        keep = max(0, min(cap - len(buf), len(chunk)))
+        buf += chunk[:keep]
+        dropped += len(chunk) - keep
+    if dropped:
+        buf += f"\n... [truncated {dropped} bytes]".encode()
+    return bytes(buf)
+
+
+async def _collect_output(proc) -> tuple[bytes, bytes]:
+    """Bounded replacement for proc.communicate()."""
+    stdout, stderr = await asyncio.gather(_drain(proc.stdout), _drain(proc.stderr))
+    await proc.wait()
+    return stdout, stderr
+
+
 # =============================================================================
 # Application Setup
 # =============================================================================
 
 start_time = time.time()
 
+_UNLOADED = object()
+
+
+def _refresh_credentials(state) -> None:
+    """
+    Load iFlow credentials onto app.state, re-reading only when config.json
+    or one of the ~/.iflow fallbacks changes (appearing or vanishing included).
+    """
+    stamp = config.credentials_stamp()
+    if getattr(state, "cred_stamp", _UNLOADED) == stamp:
+        return
+    state.cred_stamp = stamp
+    try:
+        state.api_key, state.api_base = config.get_iflow_credentials()
+        state.cred_error = None
+    except (ValueError, RuntimeError) as e:
+        state.api_key = state.api_base = None
+        state.cred_error = str(e)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management"""
     print("🚀 TermPipe FastAPI Server starting...")
     print(f"   Config: {config.config_file}")
-    yield
-    print("👋 TermPipe FastAPI Server shutting down...")
+    _refresh_credentials(app.state)
+    # Shared client: keeps TLS connections to the iFlow API alive across requests
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    )
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+        print("👋 TermPipe FastAPI Server shutting down...")
 
 
 app = FastAPI(
     title="TermPipe MCP Backend",
     description="Minimal FastAPI backend for TermPipe MCP server",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -104,12 +194,16 @@ async def root():
     }
 
 
-@app.get("/health", response_model=HealthResponse, tags=["General"])
+# Constant part of the /health body; only uptime is formatted per request
+_HEALTH_PREFIX = b'{"status":"healthy","version":"2.0.0","uptime":'
+
+
+@app.get("/health", responses={200: {"model": HealthResponse}}, tags=["General"])
 async def health_check():
     """Health check endpoint"""
-    return HealthResponse(
-        status="healthy",
-        uptime=time.time() - start_time
+    return Response(
+        content=_HEALTH_PREFIX + f"{time.time() - start_time:.3f}".encode() + b"}",
+        media_type="application/json"
     )
 
 
@@ -119,45 +213,52 @@ async def execute_command(request: CommandRequest):
     Execute a shell command.
     
     Supports:
-    - Direct command execution via raw_command
-    - Argument list via args
+    - Direct command execution via raw_command (run through $SHELL)
+    - Argument list via args (exec'd directly, no shell)
     - Timeout configuration
     """
-    start = time.time()
+    start = time.perf_counter()
     
     try:
-        # Determine command to execute
+        # Determine command to execute: raw_command needs a shell (pipes,
+        # redirects, aliases); a plain argv list is exec'd directly
         if request.command == "exec":
             if request.raw_command:
-                cmd = request.raw_command
+                argv = None
             elif request.args:
-                cmd = " ".join(request.args)
+                argv = list(request.args)
             else:
                 return CommandResponse(
                     success=False,
                     error="No command provided",
                     exit_code=1,
-                    duration=time.time() - start
+                    duration=time.perf_counter() - start
                 )
         else:
             # Other commands (ls, pwd, cat, etc.)
-            cmd = f"{request.command} {' '.join(request.args)}"
+            argv = [request.command, *request.args]
         
-        # Wrap command in interactive shell to support aliases/functions
-        shell = os.environ.get("SHELL", "/bin/bash")
-        wrapped_cmd = f"{shell} -i -c {shlex.quote(cmd)}"
-        
-        # Execute with timeout
         timeout = request.timeout or 60
-        proc = await asyncio.create_subprocess_shell(
-            wrapped_cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+        if argv is None:
+            # Wrap command in interactive shell to support aliases/functions
+            shell = os.environ.get("SHELL", "/bin/bash")
+            wrapped_cmd = f"{shell} -i -c {shlex.quote(request.raw_command)}"
+            proc = await asyncio.create_subprocess_shell(
+                wrapped_cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        else:
+            proc = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
         
+        # Execute with timeout
         try:
             stdout, stderr = await asyncio.wait_for(
-                proc.communicate(), 
+                _collect_output(proc), 
                 timeout=timeout
             )
         except asyncio.TimeoutError:
@@ -166,15 +267,15 @@ async def execute_command(request: CommandRequest):
                 success=False,
                 error=f"Command timed out after {timeout}s",
                 exit_code=124,
-                duration=time.time() - start
+                duration=time.perf_counter() - start
             )
         
         return CommandResponse(
             success=proc.returncode == 0,
-            output=stdout.decode() if stdout else "",
-            error=stderr.decode() if stderr else None,
+            output=stdout.decode(errors="replace") if stdout else "",
+            error=stderr.decode(errors="replace") if stderr else None,
             exit_code=proc.returncode or 0,
-            duration=time.time() - start
+            duration=time.perf_counter() - start
         )
         
     except Exception as e:
@@ -182,7 +283,7 @@ async def execute_command(request: CommandRequest):
             success=False,
             error=str(e),
             exit_code=1,
-            duration=time.time() - start
+            duration=time.perf_counter() - start
         )
 
 
@@ -193,63 +294,51 @@ async def nlp_query(request: NLPRequest):
     
     Uses iFlow API to translate natural language to shell commands.
     """
-    start = time.time()
+    start = time.perf_counter()
     
     try:
-        # Get iFlow credentials
-        try:
-            api_key, api_base = config.get_iflow_credentials()
-        except ValueError as e:
+        # Get iFlow credentials (loaded at startup, reloaded if config changed)
+        _refresh_credentials(app.state)
+        api_key, api_base = app.state.api_key, app.state.api_base
+        if not api_key:
             return CommandResponse(
                 success=False,
-                error=str(e),
+                error=app.state.cred_error,
                 exit_code=1,
-                duration=time.time() - start
+                duration=time.perf_counter() - start
             )
         
         # Call iFlow to translate query to command
-        import httpx
-        
-        system_prompt = """You are a Linux shell command expert. Convert natural language queries to precise shell commands.
-Rules:
-- Output ONLY the command, no explanation
-- Use standard Linux utilities (ls, grep, find, awk, sed, etc.)
-- Prioritize readability and safety
-- Use absolute paths when possible
-"""
+        client = app.state.http
+        response = await client.post(
+            f"{api_base}/chat/completions",
+            headers={"Authorization": f"Bearer {api_key}"},
+            json={
+                **_BASE_BODY,
+                "model": _get_model(),
+                "messages": [
+                    _SYSTEM_MESSAGE,
+                    {"role": "user", "content": request.query}
+                ],
+            },
+            timeout=30.0
+        )
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{api_base}/chat/completions",
-                headers={"Authorization": f"Bearer {api_key}"},
-                json={
-                    "model": config.get("default_model", "qwen3-coder-plus"),
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": request.query}
-                    ],
-                    "temperature": 0.1,
-                    "max_tokens": 500
-                },
-                timeout=30.0
+        if response.status_code != 200:
+            return CommandResponse(
+                success=False,
+                error=f"iFlow API error: HTTP {response.status_code}",
+                exit_code=1,
+                duration=time.perf_counter() - start
             )
-            
-            if response.status_code != 200:
-                return CommandResponse(
-                    success=False,
-                    error=f"iFlow API error: HTTP {response.status_code}",
-                    exit_code=1,
-                    duration=time.time() - start
-                )
-            
-            data = response.json()
-            command = data["choices"][0]["message"]["content"].strip()
-            
-            # Clean up command (remove markdown code blocks if present)
-            if command.startswith("```"):
-                lines = command.split("\n")
-                command = "\n".join(lines[1:-1]) if len(lines) > 2 else command
-                command = command.strip()
+        
+        data = response.json()
+        command = data["choices"][0]["message"]["content"].strip()
+        
+        # Clean up command (remove markdown code blocks if present)
+        m = _FENCE_RE.match(command)
+        if m:
+            command = m.group(1).strip()
         
         # Execute if requested
         if request.execute:
@@ -262,14 +351,14 @@ Rules:
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=60)
+            stdout, stderr = await asyncio.wait_for(_collect_output(proc), timeout=60)
             
             return CommandResponse(
                 success=proc.returncode == 0,
-                output=stdout.decode() if stdout else "",
-                error=stderr.decode() if stderr else None,
+                output=stdout.decode(errors="replace") if stdout else "",
+                error=stderr.decode(errors="replace") if stderr else None,
                 exit_code=proc.returncode or 0,
-                duration=time.time() - start,
+                duration=time.perf_counter() - start,
                 metadata={"command_executed": command}
             )
         else:
@@ -277,7 +366,7 @@ Rules:
             return CommandResponse(
                 success=True,
                 output=command,
-                duration=time.time() - start,
+                duration=time.perf_counter() - start,
                 metadata={"suggested_command": command}
             )
         
@@ -286,5 +375,5 @@ Rules:
             success=False,
             error=str(e),
             exit_code=1,
-            duration=time.time() - start
+            duration=time.perf_counter() - start
         )
@@ -0,0 +1,95 @@
+"""
+HTTP client and utility functions for TermPipe MCP.
+
+Constants are re-exported eagerly; the httpx-backed api_post/api_get live
+in helpers.http and are imported on first use so that callers needing only
+paths or TERMCP_URL don't pay for httpx.
+"""
+
+from typing import Tuple
+
+from .constants import (
+    HOME,
+    get_config_dir,
+    TERMPIPE_MCP_DIR,
+    THREAD_FILE,
+    CONFIG_FILE,
+    TERMPIPE_DIR,
+    CONFIG_PATH,
+    LAUNCH_SCRIPTS_DIR,
+    TERMCP_URL,
+    expand_path,
+    decode_text,
+    count_line_breaks,
+)
+
+_HTTP_EXPORTS = ("api_post", "api_get")
+
+__all__ = [
+    "HOME",
+    "get_config_dir",
+    "TERMPIPE_MCP_DIR",
+    "THREAD_FILE",
+    "CONFIG_FILE",
+    "TERMPIPE_DIR",
+    "CONFIG_PATH",
+    "LAUNCH_SCRIPTS_DIR",
+    "TERMCP_URL",
+    "expand_path",
+    "decode_text",
+    "count_line_breaks",
+    *_HTTP_EXPORTS,
+    "get_iflow_credentials",
+    "format_error",
+    "format_success",
+]
+
+
+def __getattr__(name):
+    if name in _HTTP_EXPORTS:
+        from . import http
+        return getattr(http, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_iflow_credentials() -> Tuple[str, str]:
+    """
+    Get iFlow API credentials from config files.
+    
+    Delegates to the process-wide Config instance, which caches the parsed
+    config.json until its mtime changes. Locations, in priority order:
+    1. <config_dir>/config.json
+    2. ~/.iflow/settings.json (iFlow settings)
+    3. ~/.iflow/oauth_creds.json (iFlow OAuth)
+    
+    Returns:
+        Tuple of (api_key, api_base)
+        
+    Raises:
+        FileNotFoundError: If no credentials found in any location
+    """
+    from termpipe_mcp.config import config
+    
+    try:
+        return config.get_iflow_credentials()
+    except (ValueError, RuntimeError):
+        iflow_settings = HOME / ".iflow" / "settings.json"
+        iflow_oauth = HOME / ".iflow" / "oauth_creds.json"
+        raise FileNotFoundError(
+            "iFlow API credentials not found.\n\n"
+            "Checked:\n"
+            f"  • {CONFIG_FILE}\n"
+            f"  • {iflow_settings}\n"
+            f"  • {iflow_oauth}\n\n"
+            "Configure credentials with: termcp setup"
+        )
+
+
+def format_error(error_msg: str) -> str:
+    """Format error message for display"""
+    return f"❌ Error: {error_msg}"
+
+
+def format_success(msg: str) -> str:
+    """Format success message for display"""
+    return f"✅ {msg}"
@@ -0,0 +1,119 @@
+"""
+Content-addressed cache for AI backend answers.
+
+Identical questions (same backend function, prompt, model and sampling
+settings) return the stored answer instead of re-querying. Uses diskcache
+when installed so answers survive restarts; otherwise falls back to a
+bounded in-process LRU.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .constants import TERMPIPE_MCP_DIR
+
+AI_CACHE_DIR = TERMPIPE_MCP_DIR / "ai_cache"
+AI_CACHE_TTL = 86400  # seconds
+_MEMORY_MAX = 256
+
+# Keyword arguments that don't change the answer
+_UNKEYED = ("timeout",)
+
+_cache = None
+# Callers run on worker threads (asyncio.to_thread, analysis pools); the
+# OrderedDict fallback needs this, diskcache does its own locking
+_lock = threading.Lock()
+
+
+def _get_cache():
+    """diskcache.Cache if available, else an OrderedDict of key -> (expires, value)."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            try:
+                import diskcache
+                _cache = diskcache.Cache(str(AI_CACHE_DIR), size_limit=1 << 30)
+            except ImportError:
+                _cache = OrderedDict()
+    return _cache
+
+
+def _cache_key(fn, prompt: str, kwargs: dict) -> str:
+    keyed = sorted((k, v) for k, v in kwargs.items() if k not in _UNKEYED)
+    raw = f"{fn.__module__}.{fn.__name__}|{keyed}|{prompt}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _lookup(cache, key: str) -> Optional[str]:
+    if isinstance(cache, OrderedDict):
+        with _lock:
+            hit = cache.get(key)
+            if hit is not None and hit[0] > time.monotonic():
+                cache.move_to_end(key)
+                return hit[1]
+        return None
+    return cache.get(key)
+
+
+def _store(cache, key: str, result: str):
+    if isinstance(cache, OrderedDict):
+        with _lock:
+            cache[key] = (time.monotonic() + AI_CACHE_TTL, result)
+            cache.move_to_end(key)
+            while len(cache) > _MEMORY_MAX:
+                cache.popitem(last=False)
+    else:
+        cache.set(key, result, expire=AI_CACHE_TTL)
+
+
+def cached_query(fn, prompt: str, **kwargs) -> str:
+    """
+    Call fn(prompt, **kwargs), reusing a previous answer for the same inputs.
+
+    Bracketed results ("[Error: ...]", "[Gemini timeout ...]") are returned
+    but never stored, so failures are retried on the next call.
+    """
+    cache = _get_cache()
+    key = _cache_key(fn, prompt, kwargs)
+
+    hit = _lookup(cache, key)
+    if hit is not None:
+        return hit
+
+    result = fn(prompt, **kwargs)
+    if not result.startswith("["):
+        _store(cache, key, result)
+    return result
+
+
+def cached_query_many(fn, prompts: list[str], **kwargs) -> list[str]:
+    """
+    cached_query for a batch: fn(prompts, **kwargs) returns one answer per
+    prompt and is only called with the prompts that aren't cached.
+    """
+    cache = _get_cache()
+    keys = [_cache_key(fn, p, kwargs) for p in prompts]
+    results = [_lookup(cache, k) for k in keys]
+    misses = [i for i, r in enumerate(results) if r is None]
+    if misses:
+        for i, result in zip(misses, fn([prompts[i] for i in misses], **kwargs)):
+            results[i] = result
+            if not result.startswith("["):
+                _store(cache, keys[i], result)
+    return results
+
+
+def clear_cache() -> int:
+    """Drop every cached answer; returns how many there were."""
+    cache = _get_cache()
+    if isinstance(cache, OrderedDict):
+        with _lock:
+            count = len(cache)
+            cache.clear()
+        return count
+    count = len(cache)
+    cache.clear()
+    return count
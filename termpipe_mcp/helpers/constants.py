@@ -0,0 +1,55 @@
+"""
+Path and URL constants for TermPipe MCP (no third-party imports).
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+
+# Constants
+HOME = Path.home()
+
+def get_config_dir() -> Path:
+    import platform
+    system = platform.system()
+    if system == "Windows":
+        base = Path(os.environ.get("APPDATA", HOME))
+    elif system == "Darwin":
+        base = HOME / "Library" / "Application Support"
+    else:
+        base = HOME
+    return base / "termpipe-mcp"
+
+TERMPIPE_MCP_DIR = get_config_dir()
+THREAD_FILE = HOME / "claude-antig" / "thread.md"
+CONFIG_FILE = TERMPIPE_MCP_DIR / "config.json"
+
+# Legacy/compatibility constants (for tools that expect them)
+TERMPIPE_DIR = HOME / ".termpipe"  # Original termpipe directory
+CONFIG_PATH = CONFIG_FILE  # Alias for config file
+LAUNCH_SCRIPTS_DIR = TERMPIPE_DIR / "launch_scripts"  # App launch scripts
+
+
+@lru_cache(maxsize=1024)
+def expand_path(path: str) -> Path:
+    """Path(path).expanduser(), memoized (tools see the same paths repeatedly)."""
+    return Path(path).expanduser()
+
+
+def decode_text(data: bytes) -> str:
+    """
+    data as text the way read_text() would give it: universal newlines
+    (CRLF and lone CR become LF), but undecodable bytes replaced instead
+    of raising.
+    """
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def count_line_breaks(data: bytes) -> int:
+    """Line breaks in data as decode_text sees them: LF, CRLF, lone CR."""
+    return data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
+
+
+# FastAPI server URL
+TERMCP_URL = os.environ.get("TERMCP_URL", "http://localhost:8421")
@@ -0,0 +1,101 @@
+"""
+HTTP client for the TermPipe FastAPI backend.
+"""
+
+import httpx
+from typing import Optional
+
+from .constants import TERMCP_URL
+
+
+_client: Optional[httpx.Client] = None
+
+
+def _get_client() -> httpx.Client:
+    """Return the shared keep-alive client used for FastAPI backend calls."""
+    global _client
+    if _client is None:
+        # httpx drops idle connections after 5s by default; tool calls from an
+        # agent are usually further apart than that, so keep them longer
+        _client = httpx.Client(limits=httpx.Limits(
+            max_connections=16,
+            max_keepalive_connections=4,
+            keepalive_expiry=60.0,
+        ))
+    return _client
+
+
+def api_post(endpoint: str, data: dict, timeout: float = 60.0) -> dict:
+    """
+    Make a POST request to the FastAPI server.
+    
+    Args:
+        endpoint: API endpoint (e.g. "/exec", "/nlp")
+        data: Request payload
+        timeout: Request timeout in seconds
+        
+    Returns:
+        Response dictionary with success/error status
+    """
+    try:
+        response = _get_client().post(f"{TERMCP_URL}{endpoint}", json=data, timeout=timeout)
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return {
+                "success": False,
+                "error": f"HTTP {response.status_code}: {response.text}"
+            }
+    except httpx.ConnectError:
+        return {
+            "success": False,
+            "error": f"Cannot connect to {TERMCP_URL}. Start the server with: termcp server"
+        }
+    except httpx.TimeoutException:
+        return {
+            "success": False,
+            "error": f"Request timed out after {timeout}s"
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Request failed: {str(e)}"
+        }
+
+
+def api_get(endpoint: str, params: dict = None, timeout: float = 30.0) -> dict:
+    """
+    Make a GET request to the FastAPI server.
+    
+    Args:
+        endpoint: API endpoint
+        params: Query parameters
+        timeout: Request timeout in seconds
+        
+    Returns:
+        Response dictionary with success/error status
+    """
+    try:
+        response = _get_client().get(f"{TERMCP_URL}{endpoint}", params=params, timeout=timeout)
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return {
+                "success": False,
+                "error": f"HTTP {response.status_code}: {response.text}"
+            }
+    except httpx.ConnectError:
+        return {
+            "success": False,
+            "error": f"Cannot connect to {TERMCP_URL}. Start the server with: termcp server"
+        }
+    except httpx.TimeoutException:
+        return {
+            "success": False,
+            "error": f"Request timed out after {timeout}s"
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Request failed: {str(e)}"
+        }
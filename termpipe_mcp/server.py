@@ -11,6 +11,8 @@ running on port 8421 for command execution and NLP functionality.
 Copyright © 2026 Craig Nelson
 """
 
+import importlib
+import os
 import sys
 from pathlib import Path
 
@@ -23,39 +25,33 @@ from mcp.server.fastmcp import FastMCP
 # Initialize MCP server
 mcp = FastMCP("termpipe")
 
-# Import and register all tool modules
-from termpipe_mcp.tools import (
-    process,
-    termf,
-    iflow,
-    files,
-    surgical,
-    apps,
-    wbind,
-    search,
-    thread,
-    system,
-    debug,
-    gemini_debug,
-    web_search,
-    gtt
-)
+# Tool modules, imported on demand. TERMPIPE_TOOLS (comma-separated names)
+# restricts the set so clients that only need a few tools skip the rest.
+_TOOL_MODULES = {
+    "process":      "termpipe_mcp.tools.process",
+    "termf":        "termpipe_mcp.tools.termf",
+    "iflow":        "termpipe_mcp.tools.iflow",
+    "files":        "termpipe_mcp.tools.files",
+    "surgical":     "termpipe_mcp.tools.surgical",
+    "apps":         "termpipe_mcp.tools.apps",
+    "wbind":        "termpipe_mcp.tools.wbind",
+    "search":       "termpipe_mcp.tools.search",
+    "thread":       "termpipe_mcp.tools.thread",
+    "system":       "termpipe_mcp.tools.system",
+    "debug":        "termpipe_mcp.tools.debug",
+    "gemini_debug": "termpipe_mcp.tools.gemini_debug",
+    "web_search":   "termpipe_mcp.tools.web_search",
+    "gtt":          "termpipe_mcp.tools.gtt",
+}
+
+_enabled = os.environ.get("TERMPIPE_TOOLS")
+if _enabled:
+    _wanted = {n.strip() for n in _enabled.split(",") if n.strip()}
+    _TOOL_MODULES = {k: v for k, v in _TOOL_MODULES.items() if k in _wanted}
 
 # Register all tools
-process.register_tools(mcp)
-termf.register_tools(mcp)
-iflow.register_tools(mcp)
-files.register_tools(mcp)
-surgical.register_tools(mcp)
-apps.register_tools(mcp)
-wbind.register_tools(mcp)
-search.register_tools(mcp)
-thread.register_tools(mcp)
-system.register_tools(mcp)
-debug.register_tools(mcp)
-gemini_debug.register_tools(mcp)
-web_search.register_tools(mcp)
-gtt.register_tools(mcp)
+for _name, _module_path in _TOOL_MODULES.items():
+    importlib.import_module(_module_path).register_tools(mcp)
 
 print("🚀 TermPipe MCP Server initialized", file=sys.stderr)
 
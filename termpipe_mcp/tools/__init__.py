@@ -1,20 +1,31 @@
 """
 Tool modules for TermPipe MCP Server.
+
+Submodules are imported on first attribute access so that importing one
+tool module does not drag in all the others.
 """
 
-from . import (
-    process,
-    termf,
-    iflow,
-    files,
-    surgical,
-    apps,
-    wbind,
-    search,
-    thread,
-    system,
-    debug,
-    gemini_debug,
-    web_search,
-    gtt
+import importlib
+
+__all__ = (
+    "process",
+    "termf",
+    "iflow",
+    "files",
+    "surgical",
+    "apps",
+    "wbind",
+    "search",
+    "thread",
+    "system",
+    "debug",
+    "gemini_debug",
+    "web_search",
+    "gtt",
 )
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,43 @@
+"""
+Timeout, retry and token limits for iFlow API calls.
+
+Defaults can be overridden with IFLOW_TIMEOUT_TOTAL, IFLOW_TIMEOUT_CONNECT,
+IFLOW_TIMEOUT_READ and IFLOW_MAX_RETRIES.
+"""
+
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class IFlowLimits:
+    connect: float = 5.0      # seconds to establish the connection
+    read: float = 20.0        # seconds between response chunks
+    total: float = 25.0       # seconds per attempt
+    max_retries: int = 2      # extra attempts on timeout / 429 / 5xx
+    backoff: float = 0.5      # first retry delay; doubles each attempt
+    max_tokens_default: int = 500
+    max_tokens_long: int = 1000  # free-form ifp_send / ifp_batch answers
+
+    @classmethod
+    def from_env(cls) -> "IFlowLimits":
+        env = os.environ
+        return cls(
+            connect=float(env.get("IFLOW_TIMEOUT_CONNECT", cls.connect)),
+            read=float(env.get("IFLOW_TIMEOUT_READ", cls.read)),
+            total=float(env.get("IFLOW_TIMEOUT_TOTAL", cls.total)),
+            max_retries=int(env.get("IFLOW_MAX_RETRIES", cls.max_retries)),
+        )
+
+    def retry_delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt)
+
+    def deadline(self, total: float = None, retries: int = None) -> float:
+        """Worst-case wall time of one call including retries and backoff."""
+        per_attempt = self.total if total is None else total
+        retries = self.max_retries if retries is None else retries
+        backoff = sum(self.retry_delay(a) for a in range(retries))
+        return per_attempt * (retries + 1) + backoff + 5
+
+
+IFLOW_LIMITS = IFlowLimits.from_env()
@@ -2,11 +2,34 @@
 App launcher tools for TermPipe MCP Server.
 """
 
+import os
 import subprocess
+from itertools import islice
 from pathlib import Path
 from typing import Optional
 from termpipe_mcp.helpers import LAUNCH_SCRIPTS_DIR, HOME
 
+# (directory mtime_ns, sorted app names) from the last scan
+_apps_cache: Optional[tuple[int, list[str]]] = None
+# lowercased app name -> actual app name, rebuilt alongside _apps_cache
+_apps_by_lower: dict[str, str] = {}
+
+
+def _app_names() -> list[str]:
+    """Sorted app names from LAUNCH_SCRIPTS_DIR, rescanned only when the dir changes."""
+    global _apps_cache, _apps_by_lower
+    mtime = os.stat(LAUNCH_SCRIPTS_DIR).st_mtime_ns
+    if _apps_cache and _apps_cache[0] == mtime:
+        return _apps_cache[1]
+    with os.scandir(LAUNCH_SCRIPTS_DIR) as it:
+        names = sorted(
+            e.name[7:-3] for e in it
+            if e.name.startswith("launch_") and e.name.endswith(".sh")
+        )
+    _apps_cache = (mtime, names)
+    _apps_by_lower = {name.lower(): name for name in names}
+    return names
+
 
 def register_tools(mcp):
     """Register app launcher tools with the MCP server."""
@@ -21,11 +44,11 @@ def register_tools(mcp):
         """
         script_path = LAUNCH_SCRIPTS_DIR / f"launch_{app_name}.sh"
         
-        if not script_path.exists():
-            for f in LAUNCH_SCRIPTS_DIR.glob("launch_*.sh"):
-                if f.stem.lower() == f"launch_{app_name.lower()}":
-                    script_path = f
-                    break
+        if not script_path.exists() and LAUNCH_SCRIPTS_DIR.exists():
+            _app_names()  # refresh the index if the directory changed
+            match = _apps_by_lower.get(app_name.lower())
+            if match:
+                script_path = LAUNCH_SCRIPTS_DIR / f"launch_{match}.sh"
         
         if not script_path.exists():
             return f"[Error: No launch script found for '{app_name}'. Use list_apps() to see available.]"
@@ -52,17 +75,16 @@ def register_tools(mcp):
         if not LAUNCH_SCRIPTS_DIR.exists():
             return "[No launch scripts directory found]"
         
-        apps = []
-        for f in sorted(LAUNCH_SCRIPTS_DIR.glob("launch_*.sh")):
-            name = f.stem.replace("launch_", "")
-            if filter_term is None or filter_term.lower() in name.lower():
-                apps.append(name)
+        needle = filter_term.lower() if filter_term is not None else None
+        filtered = (name for name in _app_names()
+                    if needle is None or needle in name.lower())
         
-        if not apps:
+        # Materialize only the names we show; count the rest without storing them
+        shown = list(islice(filtered, 50))
+        if not shown:
             return "[No matching apps found]"
         
-        total = len(apps)
-        shown = apps[:50]
+        total = len(shown) + sum(1 for _ in filtered)
         
         output = f"📱 Available apps ({total} total):\n"
         output += "\n".join(f"  • {app}" for app in shown)
@@ -3,9 +3,220 @@ Debug assistance tools - AI-powered debugging helper.
 Lightweight multi-agent orchestration for when Claude gets stuck.
 """
 
+import ast
+import asyncio
+import itertools
+import os
 from typing import Optional
 from pathlib import Path
 
+from termpipe_mcp.helpers import count_line_breaks, decode_text, expand_path
+from termpipe_mcp.helpers.ai_cache import cached_query
+
+
+# Static instructions go in the system message and the per-call problem,
+# goal and file content in the user message, so consecutive requests share
+# a byte-identical prefix that the provider's prompt cache can reuse.
+
+_DEBUG_SYSTEM = """You are a debugging assistant helping an AI model (Claude) that's stuck on a task.
+You will be given a PROBLEM and its CONTEXT.
+
+Analyze the situation and provide:
+1. **Root Cause**: What's actually going wrong (be specific)
+2. **Fix**: The exact solution (give concrete code/commands)
+3. **Prevention**: How to avoid this in future
+
+Be concise and actionable. Give exact line numbers, exact text to use, exact commands to run.
+Format your fix so it can be directly used."""
+
+_ANALYZE_SYSTEM = """Analyze the file you are given (its content, or for Python source an outline of
+its imports, classes and functions) and provide a structural overview:
+1. **Type/Purpose**: What kind of file is this, what does it do
+2. **Structure**: Key sections, classes, functions (with line numbers)
+3. **Key Points**: Important things to know when editing this file
+4. **Gotchas**: Potential pitfalls or tricky parts
+
+Be concise but specific with line numbers."""
+
+_EDIT_SYSTEM = """You will be given a FILE and a GOAL. Suggest the best approach for editing the file using these surgical tools:
+
+AVAILABLE TOOLS:
+- find_in_file(path, pattern) → Find text with line numbers
+- read_lines(path, start, end) → Read specific line range
+- replace_at_line(path, line_num, old_text, new_text) → Replace text on one line
+- replace_lines(path, start, end, new_content) → Replace line range
+- insert_lines(path, line_num, content) → Insert before a line
+- delete_lines(path, start, end) → Delete line range
+- smart_replace(path, old, new) → Find & replace if unique
+
+Provide:
+1. **Strategy**: Which tool(s) to use and why
+2. **Steps**: Exact tool calls with arguments (use actual line numbers from the file)
+3. **Verification**: How to confirm the edit worked
+
+Be specific - give exact line numbers, exact text to match."""
+
+
+# Files up to this size get an exact line count; bigger ones an estimate
+_COUNT_MAX = 8 << 20
+
+
+def _line_count(fh, size: int, exact: bool = False) -> tuple[int, bool]:
+    """
+    Line count of an open binary file (as len(decode_text(data).split('\\n')))
+    and whether it is exact. Past _COUNT_MAX, unless exact is asked for, it
+    is estimated from the line-break density of the first and last 64 KiB.
+    """
+    if exact or size <= _COUNT_MAX:
+        fh.seek(0)
+        total, prev_cr = 1, False
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            total += count_line_breaks(block) - (prev_cr and block.startswith(b"\n"))
+            prev_cr = block.endswith(b"\r")
+        return total, True
+    fh.seek(0)
+    sample = fh.read(65536)
+    fh.seek(size - 65536)
+    sample += fh.read(65536)
+    return round(size * count_line_breaks(sample) / len(sample)) + 1, False
+
+
+def _lines_label(total: int, exact: bool) -> str:
+    return str(total) if exact else f"~{total}"
+
+
+def _head_tail(path: Path, n: int = 30, chunk: int = 65536,
+               count_lines: bool = False) -> tuple[list[str], list[str], int, bool]:
+    """
+    First and last n lines of a file plus its line count (see _line_count),
+    reading at most 2*chunk bytes besides the count. If the file has at
+    most 2*n lines, head holds all of them and tail is empty.
+    """
+    with open(path, 'rb') as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size <= 2 * chunk:
+            lines = decode_text(fh.read()).split('\n')
+            if len(lines) <= 2 * n:
+                return lines, [], len(lines), True
+            return lines[:n], lines[-n:], len(lines), True
+        
+        # The chunks' partial edge lines are dropped, except a line that
+        # fills the whole head chunk, which is shown cut short
+        head = decode_text(fh.read(chunk)).split('\n')
+        if len(head) > 1:
+            head.pop()
+        fh.seek(size - chunk)
+        tail = decode_text(fh.read()).split('\n')[1:]
+        total, exact = _line_count(fh, size, count_lines)
+    
+    return head[:n], tail[-n:], total, exact
+
+
+def _line_slice(path: Path, start: int, end: int) -> tuple[list[str], int, bool]:
+    """Lines start..end-1 of a file, streamed, plus its line count (see _line_count)."""
+    # Text mode for universal newlines, as decode_text gives the other previews
+    with open(path, encoding='utf-8', errors='replace') as fh:
+        lines = [line.removesuffix('\n') for line in itertools.islice(fh, start, end)]
+        total, exact = _line_count(fh.buffer, os.fstat(fh.fileno()).st_size)
+    return lines, total, exact
+
+
+def _py_outline(src: str) -> Optional[str]:
+    """
+    Imports, classes and functions of Python source, one per line with its
+    0-based line number and nesting indent. None if the source doesn't parse.
+    """
+    try:
+        tree = ast.parse(src)
+    except (SyntaxError, ValueError):
+        return None
+    
+    out = []
+    
+    def visit(node, depth):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.Import):
+                what = "import " + ", ".join(a.name for a in child.names)
+            elif isinstance(child, ast.ImportFrom):
+                module = "." * child.level + (child.module or "")
+                what = f"from {module} import " + ", ".join(a.name for a in child.names)
+            elif isinstance(child, ast.ClassDef):
+                what = f"class {child.name}"
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                prefix = "async def" if isinstance(child, ast.AsyncFunctionDef) else "def"
+                what = f"{prefix} {child.name}()"
+            else:
+                visit(child, depth)
+                continue
+            out.append(f"{child.lineno - 1:4d} | {'    ' * depth}{what}")
+            visit(child, depth + 1)
+    
+    visit(tree, 0)
+    return "\n".join(out) or None
+
+
+def _debug_query(prompt: str) -> str:
+    from termpipe_mcp.tools.iflow import iflow_query
+    return iflow_query(
+        prompt,
+        system=_DEBUG_SYSTEM,
+        model="qwen3-coder-plus",  # Fast model for quick debugging
+        max_tokens=600,
+        temperature=0.2
+    )
+
+
+def _debug_context(
+    file_path: Optional[str],
+    line_start: Optional[int],
+    line_end: Optional[int],
+    include_history: bool
+) -> list[str]:
+    """Context sections (tool history, numbered file excerpt) for a debug prompt."""
+    from termpipe_mcp.tools.system import _tool_call_history, _recent_history_str
+    
+    # Build context
+    context_parts = []
+    
+    # Add recent tool history
+    if include_history and _tool_call_history:
+        context_parts.append(_recent_history_str())
+    
+    # Add file context
+    if file_path:
+        try:
+            p = expand_path(file_path)
+            if p.exists():
+                if line_start is not None:
+                    start = max(0, line_start)
+                    end = line_end if line_end is not None else line_start + 40
+                    lines, total_lines, exact = _line_slice(p, start, end)
+                    end = start + len(lines)
+                    parts = [f"File: {file_path} (lines {start}-{end} of {_lines_label(total_lines, exact)}):\n```\n"]
+                    parts.extend(f"{i:4d} | {line}\n" for i, line in enumerate(lines, start))
+                else:
+                    # Show first/last if file is long
+                    head, tail, total_lines, exact = _head_tail(p, 30)
+                    label = _lines_label(total_lines, exact)
+                    if tail:
+                        # Tail numbers are only as good as the count
+                        mark = "" if exact else "~"
+                        parts = [f"File: {file_path} ({label} lines, showing first {len(head)} + last {len(tail)}):\n```\n"]
+                        parts.extend(f"{i:4d} | {line}\n" for i, line in enumerate(head))
+                        parts.append(f"... ({mark}{max(0, total_lines - len(head) - len(tail))} lines omitted) ...\n")
+                        parts.extend(f"{mark}{i:4d} | {line}\n" for i, line in enumerate(tail, total_lines - len(tail)))
+                    else:
+                        parts = [f"File: {file_path} ({label} lines):\n```\n"]
+                        parts.extend(f"{i:4d} | {line}\n" for i, line in enumerate(head))
+                parts.append("```")
+                file_context = "".join(parts)
+                
+                context_parts.append(file_context)
+        except Exception as e:
+            context_parts.append(f"[Could not read file: {e}]")
+    
+    return context_parts
+
 
 def register_tools(mcp):
     """Register debug assistance tools with the MCP server."""
@@ -40,84 +251,17 @@ def register_tools(mcp):
         Returns:
             AI analysis with specific fix recommendations
         """
-        from termpipe_mcp.tools.iflow import iflow_query
-        from termpipe_mcp.tools.system import _tool_call_history
-        
-        # Build context
-        context_parts = []
-        
-        # Add recent tool history
-        if include_history and _tool_call_history:
-            recent = _tool_call_history[-5:]
-            history_str = "Recent tool calls:\n"
-            for call in recent:
-                result_preview = call.get('result_preview', '')[:150]
-                history_str += f"  • {call['tool']}({call['args']})\n"
-                if 'Error' in result_preview or 'error' in result_preview:
-                    history_str += f"    → {result_preview}\n"
-            context_parts.append(history_str)
-        
-        # Add file context
-        if file_path:
-            try:
-                p = Path(file_path).expanduser()
-                if p.exists():
-                    lines = p.read_text().split('\n')
-                    total_lines = len(lines)
-                    
-                    if line_start is not None:
-                        start, end = line_start, (line_end if line_end is not None else line_start + 40)
-                        start = max(0, start)
-                        end = min(total_lines, end)
-                        selected = lines[start:end]
-                        file_context = f"File: {file_path} (lines {start}-{end} of {total_lines}):\n```\n"
-                        for i, line in enumerate(selected, start):
-                            file_context += f"{i:4d} | {line}\n"
-                        file_context += "```"
-                    else:
-                        # Show first/last if file is long
-                        if total_lines > 60:
-                            file_context = f"File: {file_path} ({total_lines} lines, showing first 30 + last 30):\n```\n"
-                            for i, line in enumerate(lines[:30]):
-                                file_context += f"{i:4d} | {line}\n"
-                            file_context += f"... ({total_lines - 60} lines omitted) ...\n"
-                            for i, line in enumerate(lines[-30:], total_lines - 30):
-                                file_context += f"{i:4d} | {line}\n"
-                            file_context += "```"
-                        else:
-                            file_context = f"File: {file_path} ({total_lines} lines):\n```\n"
-                            for i, line in enumerate(lines):
-                                file_context += f"{i:4d} | {line}\n"
-                            file_context += "```"
-                    
-                    context_parts.append(file_context)
-            except Exception as e:
-                context_parts.append(f"[Could not read file: {e}]")
+        context_parts = _debug_context(file_path, line_start, line_end, include_history)
         
         # Build the prompt
-        prompt = f"""You are a debugging assistant helping an AI model (Claude) that's stuck on a task.
-
-PROBLEM:
+        prompt = f"""PROBLEM:
 {problem}
 
 CONTEXT:
-{chr(10).join(context_parts) if context_parts else "No additional context provided."}
-
-Analyze this situation and provide:
-1. **Root Cause**: What's actually going wrong (be specific)
-2. **Fix**: The exact solution (give concrete code/commands)
-3. **Prevention**: How to avoid this in future
-
-Be concise and actionable. Give exact line numbers, exact text to use, exact commands to run.
-Format your fix so it can be directly used."""
+{chr(10).join(context_parts) if context_parts else "No additional context provided."}"""
 
         try:
-            result = iflow_query(
-                prompt, 
-                model="qwen3-coder-plus",  # Fast model for quick debugging
-                max_tokens=600,
-                temperature=0.2
-            )
+            result = cached_query(_debug_query, prompt)
             
             return f"""🔧 Debug Assistant
 
@@ -129,6 +273,54 @@ Format your fix so it can be directly used."""
         except Exception as e:
             return f"[Debug assist error: {e}]"
 
+    @mcp.tool()
+    async def debug_assist_both(
+        problem: str,
+        file_path: Optional[str] = None,
+        line_start: Optional[int] = None,
+        line_end: Optional[int] = None,
+        include_history: bool = True
+    ) -> str:
+        """
+        Ask iFlow and Gemini about the same problem at once - a second opinion
+        for the price of one wait.
+        
+        Builds the same context as debug_assist and queries both backends
+        in parallel, so latency is the slower of the two, not their sum.
+        
+        Args:
+            problem: Describe what you're trying to do and what's going wrong
+            file_path: Optional file to include as context
+            line_start: Optional start line (0-based) to focus context
+            line_end: Optional end line (0-based, exclusive) to focus context
+            include_history: Include recent tool call history (default: True)
+        """
+        from termpipe_mcp.tools.gemini_debug import _DEBUG_PREFIX, _gemini_debug_query
+        
+        context_parts = _debug_context(file_path, line_start, line_end, include_history)
+        prompt = f"""PROBLEM:
+{problem}
+
+CONTEXT:
+{chr(10).join(context_parts) if context_parts else "No additional context provided."}"""
+        
+        try:
+            iflow_result, gemini_result = await asyncio.gather(
+                asyncio.to_thread(cached_query, _debug_query, prompt),
+                asyncio.to_thread(cached_query, _gemini_debug_query, f"{_DEBUG_PREFIX}\n\n{prompt}"),
+            )
+        except Exception as e:
+            return f"[Debug assist error: {e}]"
+        
+        return f"""🔧 iFlow
+
+{iflow_result}
+
+---
+🔮 Gemini
+
+{gemini_result}"""
+
     @mcp.tool()
     def analyze_file_structure(path: str) -> str:
         """
@@ -143,44 +335,49 @@ Format your fix so it can be directly used."""
         from termpipe_mcp.tools.iflow import iflow_query
         
         try:
-            p = Path(path).expanduser()
+            p = expand_path(path)
             if not p.exists():
                 return f"[Error: File not found: {path}]"
             
-            content = p.read_text()
-            lines = content.split('\n')
+            # Python source: a compact outline carries more structure per
+            # token than raw lines; anything else gets the first 100 lines.
+            # The outline needs the whole source, so the preview comes from
+            # that same read.
+            outline = None
+            if p.suffix == ".py":
+                src = decode_text(p.read_bytes())
+                outline = _py_outline(src)
+                lines = src.split('\n')
+                head, total_lines, exact = lines[:100], len(lines), True
+            else:
+                head, _, total_lines, exact = _head_tail(p, 100)
+                head = head[:100]
             
             # Basic stats
             stats = f"""File: {path}
-Lines: {len(lines)}
-Size: {len(content)} bytes
+Lines: {_lines_label(total_lines, exact)}
+Size: {p.stat().st_size} bytes
 Extension: {p.suffix}
 """
             
-            # Prepare content preview (first 100 lines max)
-            preview = '\n'.join(f"{i:4d} | {line}" for i, line in enumerate(lines[:100]))
-            if len(lines) > 100:
-                preview += f"\n... ({len(lines) - 100} more lines)"
+            if outline:
+                label, preview = "Outline (imports, classes, functions):", outline
+            else:
+                label = "Content:"
+                preview = '\n'.join(f"{i:4d} | {line}" for i, line in enumerate(head))
+                if total_lines > len(head):
+                    preview += f"\n... ({_lines_label(total_lines - len(head), exact)} more lines)"
             
-            prompt = f"""Analyze this file and provide a structural overview:
-
-{stats}
-
-Content:
+            prompt = f"""{stats}
+{label}
 ```
 {preview}
-```
-
-Provide:
-1. **Type/Purpose**: What kind of file is this, what does it do
-2. **Structure**: Key sections, classes, functions (with line numbers)
-3. **Key Points**: Important things to know when editing this file
-4. **Gotchas**: Potential pitfalls or tricky parts
-
-Be concise but specific with line numbers."""
+```"""
 
-            result = iflow_query(
+            result = cached_query(
+                iflow_query,
                 prompt,
+                system=_ANALYZE_SYSTEM,
                 model="qwen3-coder-plus",
                 max_tokens=500,
                 temperature=0.1
@@ -209,45 +406,29 @@ Be concise but specific with line numbers."""
         from termpipe_mcp.tools.iflow import iflow_query
         
         try:
-            p = Path(file_path).expanduser()
+            p = expand_path(file_path)
             if not p.exists():
                 return f"[Error: File not found: {file_path}]"
             
-            content = p.read_text()
-            lines = content.split('\n')
+            head, _, total_lines, exact = _head_tail(p, 80)
+            head = head[:80]
             
             # Show structure
-            preview = '\n'.join(f"{i:4d} | {line}" for i, line in enumerate(lines[:80]))
-            if len(lines) > 80:
-                preview += f"\n... ({len(lines) - 80} more lines)"
+            preview = '\n'.join(f"{i:4d} | {line}" for i, line in enumerate(head))
+            if total_lines > len(head):
+                preview += f"\n... ({_lines_label(total_lines - len(head), exact)} more lines)"
             
-            prompt = f"""I need to edit a file. Suggest the best approach using these surgical tools:
-
-AVAILABLE TOOLS:
-- find_in_file(path, pattern) → Find text with line numbers
-- read_lines(path, start, end) → Read specific line range
-- replace_at_line(path, line_num, old_text, new_text) → Replace text on one line
-- replace_lines(path, start, end, new_content) → Replace line range
-- insert_lines(path, line_num, content) → Insert before a line
-- delete_lines(path, start, end) → Delete line range
-- smart_replace(path, old, new) → Find & replace if unique
-
-FILE ({len(lines)} lines):
+            prompt = f"""FILE ({_lines_label(total_lines, exact)} lines):
 ```
 {preview}
 ```
 
-GOAL: {goal}
-
-Provide:
-1. **Strategy**: Which tool(s) to use and why
-2. **Steps**: Exact tool calls with arguments (use actual line numbers from the file)
-3. **Verification**: How to confirm the edit worked
-
-Be specific - give exact line numbers, exact text to match."""
+GOAL: {goal}"""
 
-            result = iflow_query(
+            result = cached_query(
+                iflow_query,
                 prompt,
+                system=_EDIT_SYSTEM,
                 model="qwen3-coder-plus",
                 max_tokens=500,
                 temperature=0.2
@@ -295,7 +476,8 @@ Based on the error message and the `--help` output, analyze the failed command a
 """
 
     try:
-        suggestion = iflow_query(
+        suggestion = cached_query(
+            iflow_query,
             prompt,
             model="qwen3-coder-plus",
             max_tokens=400,
@@ -2,10 +2,92 @@
 File operation tools for TermPipe MCP Server.
 """
 
+import errno
+import os
+import re
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
+from stat import S_ISREG
 from typing import Optional
+from termpipe_mcp.helpers import count_line_breaks, decode_text, expand_path
 from termpipe_mcp.tools.surgical.reviewer import pre_commit_gate
 
+# search_file_content: read buffer size and per-file size cap
+_SEARCH_BUFFER = 128 * 1024
+_SEARCH_MAX_BYTES = 10 * 1024 * 1024
+
+
+def _scan_one_file(path: Path, pattern_re, cap: int) -> list[str]:
+    """
+    Up to `cap` "path:line: text" matches from one file; [] if skipped.
+    A str pattern_re is matched against each line decoded, a bytes one
+    against the raw line.
+    """
+    decode = isinstance(pattern_re.pattern, str)
+    results = []
+    try:
+        # One stat for type and size; empty files can't match, huge ones are
+        # skipped, and the sniffed prefix comes from the buffer we read anyway
+        st = path.stat()
+        if not S_ISREG(st.st_mode) or not 0 < st.st_size <= _SEARCH_MAX_BYTES:
+            return results
+        with open(path, 'rb', buffering=_SEARCH_BUFFER) as fh:
+            if b"\0" in fh.peek(8192)[:8192]:
+                return results  # binary file
+            for i, line in enumerate(fh, 1):
+                if decode:
+                    line = line.decode('utf-8', errors='replace')
+                if pattern_re.search(line):
+                    text = line if decode else line.decode('utf-8', errors='replace')
+                    results.append(f"{path}:{i}: {text.strip()[:100]}")
+                    if len(results) >= cap:
+                        break
+    except OSError:
+        pass
+    return results
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """os.write until every byte is written (it may write less than asked)."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _move(src: Path, dst: Path) -> None:
+    """
+    Atomic rename where possible; across filesystems, copy regular files
+    in-kernel with sendfile (directories and special files via shutil.move).
+    """
+    try:
+        os.replace(src, dst)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    
+    if not src.is_file() or src.is_symlink():
+        shutil.move(str(src), str(dst))
+        return
+    
+    with open(src, 'rb') as sf, open(dst, 'wb') as df:
+        size = os.fstat(sf.fileno()).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(df.fileno(), sf.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    if offset != size:
+        # Source shrank under us: keep it, don't leave a partial copy
+        os.unlink(dst)
+        raise OSError(errno.EIO, f"Short copy ({offset} of {size} bytes)", str(src))
+    shutil.copystat(src, dst)
+    os.unlink(src)
+
 
 def register_tools(mcp):
     """Register file tools with the MCP server."""
@@ -25,11 +107,11 @@ def register_tools(mcp):
             offset_i: Optional[int] = int(offset) if offset is not None else None
             length_i: Optional[int] = int(length) if length is not None else None
 
-            p = Path(path).expanduser()
+            p = expand_path(path)
             if not p.exists():
                 return f"[Error: File not found: {path}]"
             
-            content = p.read_text()
+            content = decode_text(p.read_bytes())
             
             if offset_i is not None:
                 lines = content.split("\n")
@@ -56,9 +138,13 @@ def register_tools(mcp):
             content: Content to write
         """
         try:
-            p = Path(path).expanduser()
+            p = expand_path(path)
             p.parent.mkdir(parents=True, exist_ok=True)
-            p.write_text(content)
+            fd = os.open(p, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                _write_all(fd, content.encode('utf-8'))
+            finally:
+                os.close(fd)
             return f"✅ Written {len(content)} chars to {path}"
         except Exception as e:
             return f"[Error: {str(e)}]"
@@ -73,10 +159,13 @@ def register_tools(mcp):
             content: Content to append
         """
         try:
-            p = Path(path).expanduser()
+            p = expand_path(path)
             p.parent.mkdir(parents=True, exist_ok=True)
-            with open(p, "a") as f:
-                f.write(content)
+            fd = os.open(p, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+            try:
+                _write_all(fd, content.encode('utf-8'))
+            finally:
+                os.close(fd)
             return f"✅ Appended {len(content)} chars to {path}"
         except Exception as e:
             return f"[Error: {str(e)}]"
@@ -90,18 +179,20 @@ def register_tools(mcp):
             path: Directory path (supports ~ for home)
         """
         try:
-            p = Path(path).expanduser()
+            p = expand_path(path)
             if not p.exists():
                 return f"[Error: Directory not found: {path}]"
             if not p.is_dir():
                 return f"[Error: Not a directory: {path}]"
             
-            entries = []
-            for item in sorted(p.iterdir()):
-                prefix = "[DIR]" if item.is_dir() else "[FILE]"
-                entries.append(f"{prefix} {item.name}")
+            # DirEntry.is_dir() answers from readdir's d_type; only symlinks
+            # need a stat (to keep reporting links to directories as [DIR])
+            with os.scandir(p) as it:
+                entries = sorted(it, key=lambda e: e.name)
             
-            return "\n".join(entries) or "[Empty directory]"
+            return "\n".join(
+                f"{'[DIR]' if e.is_dir() else '[FILE]'} {e.name}" for e in entries
+            ) or "[Empty directory]"
             
         except Exception as e:
             return f"[Error: {str(e)}]"
@@ -116,8 +207,11 @@ def register_tools(mcp):
             path: Root directory
         """
         try:
-            p = Path(path).expanduser()
-            matches = list(p.glob(pattern))[:100]
+            p = expand_path(path)
+            # Stop walking as soon as we know there are more than 100
+            matches = list(islice(p.glob(pattern), 101))
+            truncated = len(matches) > 100
+            del matches[100:]
             
             if not matches:
                 return f"No files matching '{pattern}'"
@@ -126,7 +220,7 @@ def register_tools(mcp):
             for m in matches:
                 result += f"  {m}\n"
             
-            if len(matches) == 100:
+            if truncated:
                 result += "\n   ... (limited to 100 results)"
             
             return result
@@ -144,32 +238,39 @@ def register_tools(mcp):
             pattern: Text pattern to search
             max_results: Maximum number of results
         """
-        import re
-        
         try:
-            p = Path(path).expanduser()
+            p = expand_path(path)
             
             if p.is_file():
                 files = [p]
             else:
-                files = list(p.rglob("*"))
+                files = p.rglob("*")
             
+            # A bytes regex folds ASCII case only, so a non-ASCII pattern is
+            # matched against decoded lines instead
+            if pattern.isascii():
+                regex = re.compile(re.escape(pattern.encode()), re.IGNORECASE)
+            else:
+                regex = re.compile(re.escape(pattern), re.IGNORECASE)
             results = []
-            for f in files:
-                if not f.is_file():
-                    continue
-                try:
-                    content = f.read_text()
-                    for i, line in enumerate(content.split("\n"), 1):
-                        if pattern.lower() in line.lower():
-                            results.append(f"{f}:{i}: {line.strip()[:100]}")
-                            if len(results) >= max_results:
-                                break
-                except:
-                    continue
-                
-                if len(results) >= max_results:
-                    break
+            # Files are read concurrently but collected in walk order, so
+            # output stays deterministic. The walk is lazy with a bounded
+            # window of in-flight scans, so it stops soon after max_results
+            workers = min(32, (os.cpu_count() or 4) * 4)
+            pool = ThreadPoolExecutor(max_workers=workers)
+            try:
+                window = deque()
+                for f in files:
+                    window.append(pool.submit(_scan_one_file, f, regex, max_results))
+                    if len(window) >= workers * 2:
+                        results.extend(window.popleft().result())
+                        if len(results) >= max_results:
+                            break
+                while window and len(results) < max_results:
+                    results.extend(window.popleft().result())
+                del results[max_results:]
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
             
             if not results:
                 return f"No matches found for: {pattern}"
@@ -192,7 +293,7 @@ def register_tools(mcp):
             path: File path
         """
         try:
-            p = Path(path).expanduser()
+            p = expand_path(path)
             if not p.exists():
                 return f"[Error: File not found: {path}]"
             
@@ -218,8 +319,8 @@ def register_tools(mcp):
             
             if p.is_file() and size < 1024*1024:
                 try:
-                    with open(p) as f:
-                        line_count = sum(1 for _ in f)
+                    data = p.read_bytes()
+                    line_count = count_line_breaks(data) + (1 if data and not data.endswith((b"\n", b"\r")) else 0)
                     info += f"   Lines: {line_count}\n"
                 except:
                     pass
@@ -239,14 +340,14 @@ def register_tools(mcp):
             destination: Destination path
         """
         try:
-            src = Path(source).expanduser()
-            dst = Path(destination).expanduser()
+            src = expand_path(source)
+            dst = expand_path(destination)
             
             if not src.exists():
                 return f"[Error: Source not found: {source}]"
             
             dst.parent.mkdir(parents=True, exist_ok=True)
-            src.rename(dst)
+            _move(src, dst)
             
             return f"✅ Moved {source} → {destination}"
             
@@ -262,7 +363,7 @@ def register_tools(mcp):
             path: Directory path to create
         """
         try:
-            p = Path(path).expanduser()
+            p = expand_path(path)
             p.mkdir(parents=True, exist_ok=True)
             return f"✅ Created directory: {path}"
         except Exception as e:
@@ -3,16 +3,75 @@ Debug assistance tools - Gemini-powered debugging helper.
 Uses Google's Gemini CLI for a different model perspective.
 """
 
+import shutil
 import subprocess
 from typing import Optional
-from pathlib import Path
+
+from termpipe_mcp.helpers import count_line_breaks, decode_text, expand_path
+from termpipe_mcp.helpers.ai_cache import cached_query
+
+
+# The CLI takes a single prompt, so the static instructions are placed
+# first and the per-call problem/goal/file content appended after them;
+# repeated calls then share a stable prefix.
+
+_DEBUG_PREFIX = """You are a debugging assistant. An AI (Claude) is stuck on a task and needs help.
+You will be given a PROBLEM and its CONTEXT at the end of this message.
+
+Analyze and provide:
+1. ROOT CAUSE: What's actually wrong (be specific)
+2. FIX: The exact solution - give concrete code/commands with line numbers
+3. PREVENTION: One sentence on avoiding this
+
+Be concise. Give exact line numbers and exact text."""
+
+_ANALYZE_PREFIX = """Analyze the structure of the file at the end of this message (its content, or
+for Python source an outline of its imports, classes and functions).
+
+Provide:
+1. PURPOSE: What this file does (one sentence)
+2. STRUCTURE: Key sections with line numbers
+3. EDIT TIPS: What to watch out for when modifying"""
+
+_SUGGEST_PREFIX = """Suggest edits for the FILE at the end of this message to achieve its GOAL.
+
+AVAILABLE TOOLS:
+- find_in_file(path, pattern) - find text, returns line numbers
+- replace_at_line(path, line_num, old_text, new_text) - replace on one line
+- replace_lines(path, start, end, content) - replace line range
+- insert_lines(path, line_num, content) - insert before line
+- delete_lines(path, start, end) - delete range
+
+Give exact tool calls with actual line numbers from the file. Be specific."""
+
+
+def _head_lines(data: bytes, n: int) -> list[str]:
+    """First n lines of data, decoded; splits only the prefix it needs."""
+    if b"\r" in data:  # CR line breaks: let decode_text sort them out
+        return decode_text(data).split("\n", n)[:n]
+    return [line.decode('utf-8', errors='replace') for line in data.split(b"\n", n)[:n]]
+
+
+_gemini_path: Optional[str] = None
+
+
+def _gemini_bin() -> str:
+    """Absolute path of the gemini CLI, looked up on PATH once it's found."""
+    global _gemini_path
+    if _gemini_path is None:
+        _gemini_path = shutil.which("gemini")
+        if _gemini_path is None:
+            return "gemini"  # not installed (yet): let subprocess raise
+    return _gemini_path
 
 
 def _gemini_query(prompt: str, timeout: int = 60) -> str:
     """Query Gemini CLI with a prompt."""
+    global _gemini_path
     try:
         result = subprocess.run(
-            ["gemini", "-o", "text", prompt],
+            [_gemini_bin(), "-o", "text", prompt],
+            stdin=subprocess.DEVNULL,  # never read from the MCP stdio stream
             capture_output=True,
             text=True,
             timeout=timeout
@@ -26,11 +85,16 @@ def _gemini_query(prompt: str, timeout: int = 60) -> str:
     except subprocess.TimeoutExpired:
         return f"[Gemini timeout after {timeout}s]"
     except FileNotFoundError:
+        _gemini_path = None  # binary went away: look it up again next time
         return "[Gemini CLI not installed. Install with: npm install -g @anthropic/gemini-cli]"
     except Exception as e:
         return f"[Gemini error: {e}]"
 
 
+def _gemini_debug_query(prompt: str) -> str:
+    return _gemini_query(prompt, timeout=45)
+
+
 def register_tools(mcp):
     """Register Gemini-powered debug tools with the MCP server."""
     
@@ -53,51 +117,40 @@ def register_tools(mcp):
             line_range: Optional (start, end) line range to focus on
             include_history: Include recent tool call history (default: True)
         """
-        from termpipe_mcp.tools.system import _tool_call_history
+        from termpipe_mcp.tools.system import _tool_call_history, _recent_history_str
         
         # Build context
         context_parts = []
         
         # Add recent tool history
         if include_history and _tool_call_history:
-            recent = _tool_call_history[-5:]
-            history_str = "Recent tool calls:\n"
-            for call in recent:
-                result_preview = call.get('result_preview', '')[:150]
-                history_str += f"  - {call['tool']}({call['args']})\n"
-                if 'Error' in result_preview or 'error' in result_preview:
-                    history_str += f"    Result: {result_preview}\n"
-            context_parts.append(history_str)
+            context_parts.append(_recent_history_str(bullet="-", result_label="Result:"))
         
         # Add file context
         if file_path:
             try:
-                p = Path(file_path).expanduser()
+                p = expand_path(file_path)
                 if p.exists():
-                    lines = p.read_text().split('\n')
+                    lines = decode_text(p.read_bytes()).split('\n')
                     total_lines = len(lines)
                     
                     if line_range:
                         start, end = line_range
                         start = max(0, start)
                         end = min(total_lines, end)
-                        selected = lines[start:end]
-                        file_context = f"File: {file_path} (lines {start}-{end} of {total_lines}):\n"
-                        for i, line in enumerate(selected, start):
-                            file_context += f"{i}: {line}\n"
+                        parts = [f"File: {file_path} (lines {start}-{end} of {total_lines}):\n"]
+                        parts.extend(f"{i}: {line}\n" for i, line in enumerate(lines[start:end], start))
                     else:
                         # Truncate for large files
                         if total_lines > 50:
-                            file_context = f"File: {file_path} ({total_lines} lines, showing first 25 + last 25):\n"
-                            for i, line in enumerate(lines[:25]):
-                                file_context += f"{i}: {line}\n"
-                            file_context += f"... ({total_lines - 50} lines omitted) ...\n"
-                            for i, line in enumerate(lines[-25:], total_lines - 25):
-                                file_context += f"{i}: {line}\n"
+                            parts = [f"File: {file_path} ({total_lines} lines, showing first 25 + last 25):\n"]
+                            parts.extend(f"{i}: {line}\n" for i, line in enumerate(lines[:25]))
+                            parts.append(f"... ({total_lines - 50} lines omitted) ...\n")
+                            parts.extend(f"{i}: {line}\n" for i, line in enumerate(lines[-25:], total_lines - 25))
                         else:
-                            file_context = f"File: {file_path} ({total_lines} lines):\n"
-                            for i, line in enumerate(lines):
-                                file_context += f"{i}: {line}\n"
+                            parts = [f"File: {file_path} ({total_lines} lines):\n"]
+                            parts.extend(f"{i}: {line}\n" for i, line in enumerate(lines))
+                    file_context = "".join(parts)
                     
                     context_parts.append(file_context)
             except Exception as e:
@@ -105,21 +158,14 @@ def register_tools(mcp):
         
         context_str = '\n'.join(context_parts) if context_parts else "No additional context."
         
-        prompt = f"""You are a debugging assistant. An AI (Claude) is stuck on a task and needs help.
+        prompt = f"""{_DEBUG_PREFIX}
 
 PROBLEM: {problem}
 
 CONTEXT:
-{context_str}
+{context_str}"""
 
-Analyze and provide:
-1. ROOT CAUSE: What's actually wrong (be specific)
-2. FIX: The exact solution - give concrete code/commands with line numbers
-3. PREVENTION: One sentence on avoiding this
-
-Be concise. Give exact line numbers and exact text."""
-
-        result = _gemini_query(prompt, timeout=45)
+        result = cached_query(_gemini_debug_query, prompt)
         
         return f"""🔮 Gemini Debug Analysis
 
@@ -137,30 +183,33 @@ Be concise. Give exact line numbers and exact text."""
             path: File path to analyze
         """
         try:
-            p = Path(path).expanduser()
+            p = expand_path(path)
             if not p.exists():
                 return f"[Error: File not found: {path}]"
             
-            content = p.read_text()
-            lines = content.split('\n')
+            data = p.read_bytes()
+            total_lines = count_line_breaks(data) + 1
+            
+            outline = None
+            if p.suffix == ".py":
+                from termpipe_mcp.tools.debug import _py_outline
+                outline = _py_outline(decode_text(data))
             
-            # Truncate for prompt
-            preview = '\n'.join(f"{i}: {line}" for i, line in enumerate(lines[:80]))
-            if len(lines) > 80:
-                preview += f"\n... ({len(lines) - 80} more lines)"
+            if outline:
+                preview = outline
+            else:
+                # Truncate for prompt
+                preview = '\n'.join(f"{i}: {line}" for i, line in enumerate(_head_lines(data, 80)))
+                if total_lines > 80:
+                    preview += f"\n... ({total_lines - 80} more lines)"
             
-            prompt = f"""Analyze this file structure:
+            prompt = f"""{_ANALYZE_PREFIX}
 
-File: {path} ({len(lines)} lines, {len(content)} bytes)
+File: {path} ({total_lines} lines, {len(data)} bytes)
 
-{preview}
+{preview}"""
 
-Provide:
-1. PURPOSE: What this file does (one sentence)
-2. STRUCTURE: Key sections with line numbers
-3. EDIT TIPS: What to watch out for when modifying"""
-
-            result = _gemini_query(prompt, timeout=30)
+            result = cached_query(_gemini_query, prompt, timeout=30)
             
             return f"""📊 Gemini File Analysis: {path}
 
@@ -179,34 +228,25 @@ Provide:
             goal: What you're trying to accomplish
         """
         try:
-            p = Path(file_path).expanduser()
+            p = expand_path(file_path)
             if not p.exists():
                 return f"[Error: File not found: {file_path}]"
             
-            content = p.read_text()
-            lines = content.split('\n')
+            data = p.read_bytes()
+            total_lines = count_line_breaks(data) + 1
             
-            preview = '\n'.join(f"{i}: {line}" for i, line in enumerate(lines[:60]))
-            if len(lines) > 60:
-                preview += f"\n... ({len(lines) - 60} more lines)"
+            preview = '\n'.join(f"{i}: {line}" for i, line in enumerate(_head_lines(data, 60)))
+            if total_lines > 60:
+                preview += f"\n... ({total_lines - 60} more lines)"
             
-            prompt = f"""Suggest edits for this file.
-
-AVAILABLE TOOLS:
-- find_in_file(path, pattern) - find text, returns line numbers
-- replace_at_line(path, line_num, old_text, new_text) - replace on one line
-- replace_lines(path, start, end, content) - replace line range
-- insert_lines(path, line_num, content) - insert before line
-- delete_lines(path, start, end) - delete range
+            prompt = f"""{_SUGGEST_PREFIX}
 
-FILE ({len(lines)} lines):
+FILE ({total_lines} lines):
 {preview}
 
-GOAL: {goal}
-
-Give exact tool calls with actual line numbers from the file. Be specific."""
+GOAL: {goal}"""
 
-            result = _gemini_query(prompt, timeout=30)
+            result = cached_query(_gemini_query, prompt, timeout=30)
             
             return f"""📝 Gemini Edit Strategy
 
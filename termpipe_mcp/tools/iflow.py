@@ -3,31 +3,94 @@ iFlow AI backend tools for TermPipe MCP Server.
 """
 
 import asyncio
+import atexit
 import concurrent.futures
+import sys
+import threading
+import time
+from functools import lru_cache
 from typing import Optional
+
+import aiohttp
+
 from termpipe_mcp.helpers import api_get, get_iflow_credentials
+from termpipe_mcp.helpers.ai_cache import cached_query, cached_query_many, clear_cache
+from termpipe_mcp.tools._llm_config import IFLOW_LIMITS
+
+# Optional standalone backend living next to the package checkout;
+# ifp_send falls back to iflow_query when it isn't there
+_CHECKOUT_ROOT = str(__file__).rsplit('/', 3)[0]
+if _CHECKOUT_ROOT not in sys.path:
+    sys.path.insert(0, _CHECKOUT_ROOT)
+try:
+    from iflow_backend import IFlowBackend as _IFlowBackend
+except ImportError:
+    _IFlowBackend = None
 
 # Global model state
 _iflow_model = "qwen3-coder-plus"
 
+# Pooled ClientSession per event loop (sessions can't cross loops), so
+# keep-alive connections, TLS sessions and DNS lookups are reused
+_sessions: dict = {}
+
+
+async def _get_session():
+    """Shared aiohttp session for the running loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=16,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def close_session():
+    """Close the running loop's shared session (call before the loop closes)."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+@lru_cache(maxsize=1)
+def _creds() -> tuple[str, str]:
+    """get_iflow_credentials() once per process (errors aren't cached)."""
+    return get_iflow_credentials()
+
+
+# Transient failures worth another attempt
+_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
 
 async def iflow_query_async(
     prompt: str,
     system: Optional[str] = None,
     model: Optional[str] = None,
-    max_tokens: int = 500,
+    max_tokens: int = IFLOW_LIMITS.max_tokens_default,
     temperature: float = 0.2,
-    timeout: int = 30,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
 ):
-    """Direct async query to iFlow API."""
-    import aiohttp
-    import time
+    """
+    Direct async query to iFlow API.
     
+    timeout bounds each attempt (default IFLOW_LIMITS.total); timeouts,
+    429s and 5xx responses are retried with exponential backoff up to
+    max_retries times (default IFLOW_LIMITS.max_retries).
+    """
     global _iflow_model
     start = time.time()
     
+    use_model = model or _iflow_model
+    
     try:
-        api_key, api_base = get_iflow_credentials()
+        api_key, api_base = _creds()
     except FileNotFoundError as e:
         return {"success": False, "content": "", "error": str(e)}
     
@@ -36,69 +99,146 @@ async def iflow_query_async(
         messages.append({"role": "system", "content": system})
     messages.append({"role": "user", "content": prompt})
     
-    use_model = model or _iflow_model
+    limits = IFLOW_LIMITS
+    total = limits.total if timeout is None else timeout
+    retries = limits.max_retries if max_retries is None else max_retries
+    client_timeout = aiohttp.ClientTimeout(
+        total=total,
+        connect=min(limits.connect, total),
+        sock_read=min(limits.read, total),
+    )
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{api_base}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": use_model,
-                    "messages": messages,
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                },
-                timeout=aiohttp.ClientTimeout(total=timeout)
-            ) as resp:
-                data = await resp.json()
-                elapsed = time.time() - start
-                
-                if "choices" in data:
-                    usage = data.get("usage", {})
-                    return {
-                        "success": True,
-                        "content": data["choices"][0]["message"]["content"],
+        session = await _get_session()
+        for attempt in range(retries + 1):
+            last = attempt == retries
+            try:
+                async with session.post(
+                    f"{api_base}/chat/completions",
+                    headers={
+                        "Authorization": f"Bearer {api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json={
                         "model": use_model,
-                        "response_time": elapsed,
-                        "tokens_used": usage.get("total_tokens", 0),
-                    }
-                else:
-                    error = data.get("error", {}).get("message", str(data))
-                    return {"success": False, "content": "", "error": error}
-                    
+                        "messages": messages,
+                        "max_tokens": max_tokens,
+                        "temperature": temperature,
+                    },
+                    timeout=client_timeout
+                ) as resp:
+                    if resp.status in _RETRY_STATUS and not last:
+                        await asyncio.sleep(limits.retry_delay(attempt))
+                        continue
+                    if resp.status == 401:
+                        _creds.cache_clear()  # key rotated: re-read it next call
+                    data = await resp.json()
+                    break
+            except asyncio.TimeoutError:
+                if last:
+                    raise
+                await asyncio.sleep(limits.retry_delay(attempt))
+        
+        elapsed = time.time() - start
+        
+        if "choices" in data:
+            usage = data.get("usage", {})
+            return {
+                "success": True,
+                "content": data["choices"][0]["message"]["content"],
+                "model": use_model,
+                "tokens_used": usage.get("total_tokens", 0),
+                "response_time": elapsed,
+            }
+        else:
+            error = data.get("error", {}).get("message", str(data))
+            return {"success": False, "content": "", "error": error}
+            
     except asyncio.TimeoutError:
-        return {"success": False, "content": "", "error": f"Timeout after {timeout}s"}
+        return {"success": False, "content": "", "error": f"Timeout after {total}s ({retries + 1} attempts)"}
     except Exception as e:
         return {"success": False, "content": "", "error": str(e)}
 
 
+# Max concurrent requests one batch sends to the API
+BATCH_CONCURRENCY = 16
+
+
+async def iflow_query_many_async(prompts: list[str], **kwargs) -> list[dict]:
+    """Query iFlow with several prompts concurrently; results in prompt order."""
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def one(prompt):
+        async with sem:
+            return await iflow_query_async(prompt, **kwargs)
+    
+    return await asyncio.gather(*(one(p) for p in prompts))
+
+
+# One event loop in a daemon thread serves every sync caller, so the pooled
+# session (connections, TLS, DNS cache) survives from one call to the next
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="iflow-loop", daemon=True).start()
+            atexit.register(_shutdown_loop)
+        return _loop
+
+
+def _shutdown_loop():
+    """Close the shared session and stop the background loop (atexit)."""
+    if _loop is None or not _loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(close_session(), _loop).result(timeout=5)
+    except Exception:
+        pass
+    _loop.call_soon_threadsafe(_loop.stop)
+
+
+def _run_sync(coro, timeout: float = 60):
+    """Run a coroutine on the background loop and wait for its result."""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+def _result_text(result: dict) -> str:
+    if result["success"]:
+        return result["content"]
+    return f"[Error: {result.get('error', 'Unknown error')}]"
+
+
 def iflow_query(prompt: str, **kwargs) -> str:
     """Synchronous wrapper for iFlow query."""
-    def run_async():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(iflow_query_async(prompt, **kwargs))
-        finally:
-            loop.close()
-    
     try:
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(run_async)
-            result = future.result(timeout=60)
-        
-        if result["success"]:
-            return result["content"]
-        else:
-            return f"[Error: {result.get('error', 'Unknown error')}]"
+        deadline = IFLOW_LIMITS.deadline(kwargs.get("timeout"), kwargs.get("max_retries"))
+        return _result_text(_run_sync(iflow_query_async(prompt, **kwargs), timeout=deadline))
     except Exception as e:
         return f"[Error: {str(e)}]"
 
 
+def iflow_query_many(prompts: list[str], **kwargs) -> list[str]:
+    """Synchronous wrapper for iflow_query_many_async (one string per prompt)."""
+    try:
+        # Prompts beyond BATCH_CONCURRENCY wait for a free slot
+        waves = -(-len(prompts) // BATCH_CONCURRENCY) or 1
+        deadline = IFLOW_LIMITS.deadline(kwargs.get("timeout"), kwargs.get("max_retries")) * waves
+        results = _run_sync(iflow_query_many_async(prompts, **kwargs), timeout=deadline)
+        return [_result_text(r) for r in results]
+    except Exception as e:
+        return [f"[Error: {str(e)}]"] * len(prompts)
+
+
 def register_tools(mcp):
     """Register iFlow tools with the MCP server."""
     global _iflow_model
@@ -116,38 +256,61 @@ def register_tools(mcp):
         """
         global _iflow_model
         
+        use_model = model or _iflow_model
+        
+        if _IFlowBackend is None:
+            return cached_query(iflow_query, message, model=use_model,
+                                max_tokens=IFLOW_LIMITS.max_tokens_long)
+        
+        async def _query():
+            backend = _IFlowBackend(model=use_model)
+            try:
+                result = await backend.query(message)
+                if result.success:
+                    return f"{result.content}\n\n[{result.model} | {result.response_time:.2f}s | {result.tokens_used} tokens]"
+                else:
+                    return f"Error: {result.error}"
+            finally:
+                await backend.close()
+        
+        return _run_sync(_query())
+
+    @mcp.tool()
+    def ifp_batch(messages: list[str], model: Optional[str] = None) -> str:
+        """
+        Send several independent tasks to iFlow at once.
+        
+        Requests run concurrently, so the batch takes about as long
+        as its slowest message rather than the sum of all of them.
+        
+        Args:
+            messages: Prompts to send (each answered independently)
+            model: Optional model override (default: current model)
+        """
+        if not messages:
+            return "[Error: No messages provided]"
+        
+        results = cached_query_many(iflow_query_many, messages, model=model or _iflow_model,
+                                    max_tokens=IFLOW_LIMITS.max_tokens_long)
+        return "\n\n---\n\n".join(
+            f"[{i}] {result}" for i, result in enumerate(results, 1)
+        )
+
+    @mcp.tool()
+    def ifp_cache_clear() -> str:
+        """Clear cached AI answers (forces fresh answers for repeat prompts)."""
+        count = clear_cache()
+        return f"✅ Cleared {count} cached AI answers"
+
+    @mcp.tool()
+    def ifp_reload_credentials() -> str:
+        """Re-read iFlow credentials from disk (after changing the API key)."""
+        _creds.cache_clear()
         try:
-            import sys
-            sys.path.insert(0, str(__file__).rsplit('/', 3)[0])
-            from iflow_backend import IFlowBackend
-            
-            use_model = model or _iflow_model
-            
-            def run_async():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    async def _query():
-                        backend = IFlowBackend(model=use_model)
-                        try:
-                            result = await backend.query(message)
-                            if result.success:
-                                return f"{result.content}\n\n[{result.model} | {result.response_time:.2f}s | {result.tokens_used} tokens]"
-                            else:
-                                return f"Error: {result.error}"
-                        finally:
-                            await backend.close()
-                    return loop.run_until_complete(_query())
-                finally:
-                    loop.close()
-            
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(run_async)
-                return future.result(timeout=60)
-            
-        except ImportError:
-            result = iflow_query(message, model=model, max_tokens=1000)
-            return result
+            _creds()
+        except FileNotFoundError as e:
+            return f"[Error: {e}]"
+        return "✅ Reloaded iFlow credentials"
 
     @mcp.tool()
     def ifp_model(model_name: str) -> str:
@@ -2,25 +2,127 @@
 Process management tools for TermPipe MCP Server.
 """
 
+import codecs
+import heapq
 import os
 import subprocess
+import threading
 from datetime import datetime
 from typing import Optional, Dict, Any
 
 
+# Unread output kept per session; older bytes are dropped (and counted)
+# so a chatty process nobody reads can't grow the server without bound
+_OUTPUT_MAX = 4 * 1024 * 1024
+
+
+def _pump(stream, info: Dict[str, Any], ready: threading.Event):
+    """Drain a child's pipe into info["output"] so the child never stalls on a full pipe."""
+    buf, lock = info["output"], info["output_lock"]
+    try:
+        for chunk in iter(lambda: stream.read1(4096), b""):
+            with lock:
+                buf.extend(chunk)
+                excess = len(buf) - _OUTPUT_MAX
+                if excess > 0:
+                    del buf[:excess]
+                    info["dropped"] += excess
+            ready.set()
+    except (OSError, ValueError):
+        pass  # pipe closed underneath us
+    ready.set()  # EOF is news too
+
+
+def _read_proc(pid: str, name: str) -> bytes:
+    with open(f"/proc/{pid}/{name}", "rb") as f:
+        return f.read()
+
+
+def _top_by_rss(n: int) -> tuple[list[tuple[int, int, str]], int]:
+    """
+    (pid, rss_bytes, command) for the n largest processes, plus the total
+    process count. Only statm is read for every process; command lines
+    are read just for the n that are kept.
+    """
+    page = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    
+    def sizes():
+        nonlocal total
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit():
+                continue
+            try:
+                rss = int(_read_proc(pid, "statm").split()[1]) * page
+            except (OSError, ValueError, IndexError):
+                continue  # exited while we were scanning
+            total += 1
+            yield pid, rss
+    
+    top = []
+    for pid, rss in heapq.nlargest(n, sizes(), key=lambda t: t[1]):
+        try:
+            cmd = _read_proc(pid, "cmdline").replace(b"\0", b" ").replace(b"\n", b" ").strip()
+            if not cmd:  # kernel thread
+                cmd = b"[" + _read_proc(pid, "comm").strip() + b"]"
+        except OSError:
+            continue
+        top.append((int(pid), rss, cmd.decode("utf-8", errors="replace")))
+    return top, total
+
+
+def _format_rss(size: int) -> str:
+    if size > 1024 * 1024 * 1024:
+        return f"{size / (1024 * 1024 * 1024):.1f} GB"
+    if size > 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{size / 1024:.0f} KB"
+
+
 class ProcessManager:
     """Track running processes for interactive sessions (REPLs, background jobs)"""
     
     def __init__(self):
         self.processes: Dict[int, Dict[str, Any]] = {}
+        # Set by any reader thread when new output (or EOF) arrives
+        self.output_ready = threading.Event()
     
     def add(self, pid: int, proc: subprocess.Popen, command: str):
-        self.processes[pid] = {
+        info = {
             "command": command,
             "process": proc,
             "started": datetime.now(),
-            "blocked": True
+            "blocked": True,
+            "exited": False,
+            "output": bytearray(),
+            "output_lock": threading.Lock(),
+            "dropped": 0,  # bytes discarded since the last take_output
+            "readers": [],
+            # Keeps a multi-byte character split across two reads intact
+            "decoder": codecs.getincrementaldecoder("utf-8")(errors="replace"),
         }
+        for stream in (proc.stdout, proc.stderr):
+            if stream is not None:
+                t = threading.Thread(target=_pump, args=(stream, info, self.output_ready), daemon=True)
+                t.start()
+                info["readers"].append(t)
+        self.processes[pid] = info
+    
+    def has_output(self, pid: int) -> bool:
+        return bool(self.processes[pid]["output"])
+    
+    def take_output(self, pid: int, final: bool = False) -> str:
+        """Output captured since the last call (stdout and stderr interleaved)."""
+        info = self.processes[pid]
+        with info["output_lock"]:
+            data = bytes(info["output"])
+            info["output"].clear()
+            dropped, info["dropped"] = info["dropped"], 0
+        if not dropped:
+            return info["decoder"].decode(data, final=final)
+        # What the decoder was holding no longer lines up with data
+        info["decoder"].reset()
+        return f"[… {dropped} bytes dropped]\n" + info["decoder"].decode(data, final=final)
     
     def get(self, pid: int) -> Optional[Dict[str, Any]]:
         return self.processes.get(pid)
@@ -38,6 +140,7 @@ class ProcessManager:
             del self.processes[pid]
     
     def list_all(self) -> list[dict]:
+        """Tracked processes as of the last poll (see cleanup_finished)."""
         result = []
         for pid, info in self.processes.items():
             proc = info["process"]
@@ -45,15 +148,23 @@ class ProcessManager:
                 "pid": pid,
                 "command": info["command"],
                 "started": info["started"].isoformat(),
-                "running": proc.poll() is None,
+                "running": not info["exited"],
                 "blocked": info.get("blocked", False),
                 "return_code": proc.returncode
             })
         return result
     
+    @staticmethod
+    def poll(info: Dict[str, Any]) -> Optional[int]:
+        """Exit code, or None while running; no waitpid once it has exited."""
+        proc = info["process"]
+        if not info["exited"] and proc.poll() is not None:
+            info["exited"] = True
+        return proc.returncode
+    
     def cleanup_finished(self):
-        finished = [pid for pid, info in self.processes.items() 
-                   if info["process"].poll() is not None]
+        finished = [pid for pid, info in self.processes.items()
+                    if self.poll(info) is not None]
         for pid in finished:
             self.remove(pid)
 
@@ -94,36 +205,74 @@ def register_tools(mcp):
         if not proc_info:
             return f"[Error: No session found with PID {pid}]"
         
-        proc = proc_info["process"]
-        poll_result = proc.poll()
+        poll_result = process_manager.poll(proc_info)
         if poll_result is not None:
+            # Let the readers hit EOF so the tail of the output isn't lost
+            for t in proc_info["readers"]:
+                t.join(timeout=1)
+            output = process_manager.take_output(pid, final=True)
             process_manager.remove(pid)
-            stdout = proc.stdout.read() if proc.stdout else ""
-            return f"✅ Process finished (exit code: {poll_result})\n\n{stdout}"
+            return f"✅ Process finished (exit code: {poll_result})\n\n{output}"
+        
+        if not proc_info["readers"]:
+            return f"⏳ Process {pid} running (no stdout available)"
         
         try:
-            import fcntl
-            stdout = proc.stdout
-            if stdout:
-                flags = fcntl.fcntl(stdout.fileno(), fcntl.F_GETFL)
-                fcntl.fcntl(stdout.fileno(), fcntl.F_SETFL, flags | os.O_NONBLOCK)
-                
-                try:
-                    output = stdout.read()
-                    if output:
-                        process_manager.set_blocked(pid, False)
-                        return f"📤 Output:\n{output.decode('utf-8', errors='replace') if isinstance(output, bytes) else output}"
-                except BlockingIOError:
-                    pass
-                
-                process_manager.set_blocked(pid, True)
-                return f"⏳ Process {pid} is waiting for input (REPL prompt detected)"
+            output = process_manager.take_output(pid)
+            if output:
+                process_manager.set_blocked(pid, False)
+                return f"📤 Output:\n{output}"
             
-            return f"⏳ Process {pid} running (no stdout available)"
+            process_manager.set_blocked(pid, True)
+            return f"⏳ Process {pid} is waiting for input (REPL prompt detected)"
             
         except Exception as e:
             return f"[Error reading output: {str(e)}]"
 
+    @mcp.tool()
+    def poll_sessions(timeout_ms: int = 1000) -> str:
+        """
+        Wait for output from any running session and return all of it.
+        
+        One call instead of a read_process_output per session: blocks for
+        up to timeout_ms until at least one session has new output (or
+        exits), then returns the output of every session that has some.
+        
+        Args:
+            timeout_ms: Longest time to wait for output
+        """
+        def ready() -> list[int]:
+            return [pid for pid, info in process_manager.processes.items()
+                    if process_manager.has_output(pid) or process_manager.poll(info) is not None]
+        
+        if not process_manager.processes:
+            return "📭 No active sessions"
+        
+        # Clear before checking, so output arriving in between still wakes us
+        process_manager.output_ready.clear()
+        pids = ready()
+        if not pids:
+            # Re-check even on timeout: a child can be reaped after its EOF
+            process_manager.output_ready.wait(timeout_ms / 1000)
+            pids = ready()
+        if not pids:
+            return f"⏳ No new output from {len(process_manager.processes)} sessions"
+        
+        parts = []
+        for pid in pids:
+            info = process_manager.get(pid)
+            code = process_manager.poll(info)
+            if code is not None:
+                for t in info["readers"]:
+                    t.join(timeout=1)
+                output = process_manager.take_output(pid, final=True)
+                process_manager.remove(pid)
+                parts.append(f"✅ PID {pid} finished (exit code: {code})\n{output}")
+            else:
+                process_manager.set_blocked(pid, False)
+                parts.append(f"📤 PID {pid}:\n{process_manager.take_output(pid)}")
+        return "\n\n".join(parts)
+
     @mcp.tool()
     def interact_with_process(pid: int, input: str) -> str:
         """
@@ -135,7 +284,7 @@ def register_tools(mcp):
         
         proc = proc_info["process"]
         
-        if proc.poll() is not None:
+        if process_manager.poll(proc_info) is not None:
             process_manager.remove(pid)
             return f"[Error: Process {pid} is no longer running]"
         
@@ -180,8 +329,20 @@ def register_tools(mcp):
     def list_processes() -> str:
         """List all running processes (system-wide)."""
         try:
+            if os.path.isdir("/proc"):
+                top, total = _top_by_rss(50)
+                output = "🖥️  System Processes (sorted by memory):\n\n"
+                output += f"{'PID':>8}  {'RSS':>9}  COMMAND\n"
+                output += "\n".join(
+                    f"{pid:>8}  {_format_rss(rss):>9}  {cmd[:200]}" for pid, rss, cmd in top
+                )
+                if total > len(top):
+                    output += f"\n... and {total - len(top)} more (use 'ps aux' for full list)"
+                return output
+            
+            # No /proc (macOS, BSD): ask ps
             proc = subprocess.run(
-                ["ps", "aux", "--sort=-%mem"],
+                ["ps", "aux", "-m"],
                 capture_output=True,
                 text=True,
                 timeout=10
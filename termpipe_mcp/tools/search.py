@@ -2,32 +2,184 @@
 Search tools for TermPipe MCP Server.
 """
 
+import glob
+import itertools
+import json
+import re
 import shutil
 import subprocess
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from datetime import datetime
 from typing import Optional
 
 _HAS_RG = shutil.which("rg") is not None
 
-# Active searches storage — max 50 entries, 1-hour TTL
-_active_searches = {}
-_SEARCH_TTL_SECS = 3600
-_SEARCH_MAX = 50
+# Search ids: unique for the life of the process
+_search_counter = itertools.count()
 
+# How long start_search waits for a streaming search before returning
+_FIRST_RESULTS_WAIT = 1.0
 
-def _evict_searches():
-    """Remove expired and excess searches."""
-    import time
-    now = time.time()
-    expired = [k for k, v in _active_searches.items()
-               if now - v.get("created_at", now) > _SEARCH_TTL_SECS]
-    for k in expired:
-        del _active_searches[k]
-    # Trim to max if still over
-    while len(_active_searches) >= _SEARCH_MAX:
-        oldest = min(_active_searches, key=lambda k: _active_searches[k].get("created_at", 0))
-        del _active_searches[oldest]
+
+def _stop(search: dict):
+    """Terminate a search's subprocess if it is still running."""
+    proc = search.get("process")
+    if proc is not None and proc.poll() is None:
+        proc.terminate()
+
+
+class SearchStore:
+    """
+    Search sessions by id, bounded two ways: the oldest entries are evicted
+    past max_entries, and entries older than ttl seconds are dropped lazily
+    whenever the store is touched. Evicted searches are stopped.
+    """
+    
+    def __init__(self, max_entries: int = 64, ttl: float = 1800):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _expire(self):
+        # Oldest-created first (put order), so stop at the first live one
+        cutoff = time.monotonic() - self.ttl
+        while self._entries:
+            sid, search = next(iter(self._entries.items()))
+            if search["created_at"] > cutoff:
+                break
+            _stop(self._entries.pop(sid))
+    
+    def put(self, search_id: str, search: dict):
+        search["created_at"] = time.monotonic()
+        with self._lock:
+            self._expire()
+            self._entries[search_id] = search
+            while len(self._entries) > self.max_entries:
+                _stop(self._entries.popitem(last=False)[1])
+    
+    def get(self, search_id: str) -> Optional[dict]:
+        with self._lock:
+            self._expire()
+            return self._entries.get(search_id)
+    
+    def pop(self, search_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._entries.pop(search_id, None)
+    
+    def items(self) -> list[tuple[str, dict]]:
+        with self._lock:
+            self._expire()
+            return list(self._entries.items())
+
+
+_store = SearchStore()
+
+
+def _collect(search: dict, keep, max_results: int, timeout: float):
+    """
+    Reader thread: append each stdout line that keep() accepts to
+    search["results"] as it arrives, stopping the process once it has
+    max_results or has run for timeout seconds. Lines are passed to keep()
+    as raw bytes, so only the ones it accepts are ever decoded.
+    """
+    proc = search["process"]
+    timer = threading.Timer(timeout, _stop, args=(search,))
+    timer.daemon = True
+    timer.start()
+    try:
+        for line in proc.stdout:
+            item = keep(line.rstrip(b"\n"))
+            if item is not None:
+                search["results"].append(item)
+                if len(search["results"]) >= max_results:
+                    break
+    finally:
+        timer.cancel()
+        _stop(search)
+        proc.stdout.close()
+        proc.wait()
+        search["done"] = True
+
+
+def _stream_search(search: dict, cmd: list[str], keep, max_results: int, timeout: float):
+    """Start cmd and stream its accepted output lines into search["results"]."""
+    search["process"] = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    reader = threading.Thread(
+        target=_collect, args=(search, keep, max_results, timeout), daemon=True
+    )
+    reader.start()
+    reader.join(min(timeout, _FIRST_RESULTS_WAIT))
+
+
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+
+def _find_cmd(root: Path, pattern: str, file_pattern: Optional[str],
+              ignore_case: bool, literal: bool):
+    """
+    (argv, keep) for a file-mode search. Substring patterns are matched
+    by find itself with -path/-ipath, so only hits cross the pipe; real
+    regexes are applied to find's output in Python.
+    """
+    cmd = ["find", str(root), "-type", "f"]
+    if file_pattern:
+        cmd.extend(["-name", file_pattern])
+    
+    regex = None
+    if not literal and _REGEX_META.intersection(pattern):
+        try:
+            regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        except re.error:
+            pass  # not a valid regex (e.g. "*.py"): match it literally
+    
+    if regex is None and pattern:
+        cmd.extend(["-ipath" if ignore_case else "-path", f"*{glob.escape(pattern)}*"])
+    cmd.append("-print")
+    
+    if regex is None:
+        return cmd, lambda f: {"file": _decode(f)} if f else None
+    
+    def keep(line: bytes) -> Optional[dict]:
+        f = _decode(line)
+        return {"file": f} if f and regex.search(f) else None
+    return cmd, keep
+
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace")
+
+
+# rg --json writes "type" first; begin/end/summary events are skipped
+# without being parsed
+_RG_KEPT = (b'{"type":"match"', b'{"type":"context"')
+
+
+def _rg_event(line: bytes) -> Optional[dict]:
+    """Slim result dict for an rg --json match/context event, else None."""
+    if not line.startswith(_RG_KEPT):
+        return None
+    ev = json.loads(line)
+    if ev["type"] not in ("match", "context"):
+        return None
+    data = ev["data"]
+    return {
+        "path": data["path"].get("text", "<non-utf8 path>"),
+        "line": data.get("line_number"),
+        "text": data["lines"].get("text", "").rstrip("\n"),
+        "match": ev["type"] == "match",
+    }
+
+
+def _format_content_result(r) -> str:
+    if isinstance(r, str):  # grep fallback: raw output line
+        return r
+    sep = ":" if r["match"] else "-"
+    return f"{r['path']}{sep}{r['line']}{sep}{r['text']}"
 
 
 def register_tools(mcp):
@@ -59,35 +211,28 @@ def register_tools(mcp):
             contextLines: Lines of context around matches
             timeout_ms: Timeout in milliseconds
         """
-        search_id = f"search_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        search_id = f"search_{next(_search_counter):08x}"
         
         try:
             p = Path(path).expanduser()
             if not p.exists():
                 return f"[Error: Path not found: {path}]"
             
+            search = {
+                "type": "files",
+                "pattern": pattern,
+                "results": [],
+                "path": path,
+                "done": False,
+            }
+            
             if searchType == "files":
-                if filePattern:
-                    find_cmd = f"find {path} -type f -name '{filePattern}' 2>/dev/null | head -100"
-                else:
-                    find_cmd = f"find {path} -type f 2>/dev/null | head -100"
-                result = subprocess.run(
-                    find_cmd, shell=True, capture_output=True, text=True, timeout=15
-                )
-                files = [f for f in result.stdout.strip().split("\n") if f and pattern in f]
-                import time
-                _evict_searches()
-                _active_searches[search_id] = {
-                    "type": "files",
-                    "pattern": pattern,
-                    "results": [{"file": f} for f in files[:maxResults]],
-                    "path": path,
-                    "created_at": time.time(),
-                }
+                # argv, no shell: filePattern and path are never interpolated
+                cmd, keep = _find_cmd(p, pattern, filePattern, ignoreCase, literalSearch)
             else:
                 # Content search: prefer ripgrep, fall back to grep
                 if _HAS_RG:
-                    cmd = ["rg", "--color=never"]
+                    cmd = ["rg", "--json"]
                     if ignoreCase:
                         cmd.append("-i")
                     if contextLines > 0:
@@ -95,6 +240,7 @@ def register_tools(mcp):
                     if filePattern:
                         cmd.extend(["-g", filePattern])
                     cmd.extend(["-e", pattern, path])
+                    keep = _rg_event
                 else:
                     cmd = ["grep", "-r", "--include=" + (filePattern or "*")]
                     if ignoreCase:
@@ -102,30 +248,18 @@ def register_tools(mcp):
                     if contextLines > 0:
                         cmd.extend([f"-A{contextLines}", f"-B{contextLines}"])
                     cmd.extend([pattern, path])
-
-                result = subprocess.run(
-                    cmd, capture_output=True, text=True, timeout=timeout_ms/1000
-                )
-                lines = result.stdout.strip().split("\n") if result.stdout.strip() else []
-                results = []
-                for line in lines[:maxResults * 2]:
-                    if line:
-                        results.append(line)
-                
-                _active_searches[search_id] = {
-                    "type": "content",
-                    "pattern": pattern,
-                    "results": results[:maxResults],
-                    "path": path,
-                    "created_at": time.time(),
-                }
+                    keep = lambda line: _decode(line) if line else None
+                search["type"] = "content"
             
-            count = len(_active_searches[search_id]["results"])
-            return f"🔍 Search started: {search_id}\n   Found {count} results for '{pattern}'\n   Use get_more_search_results('{search_id}') to view"
+            # Stored only once the command has started: a failed spawn
+            # raises here and must not leave a forever-running entry behind
+            _stream_search(search, cmd, keep, maxResults, timeout_ms / 1000)
+            _store.put(search_id, search)
+            
+            count = len(search["results"])
+            status = "" if search["done"] else " so far (still searching)"
+            return f"🔍 Search started: {search_id}\n   Found {count} results{status} for '{pattern}'\n   Use get_more_search_results('{search_id}') to view"
             
-        except subprocess.TimeoutExpired:
-            return f"[Error: Search timed out after {timeout_ms}ms]"
-
         except Exception as e:
             return f"[Error: {str(e)}]"
 
@@ -139,20 +273,25 @@ def register_tools(mcp):
             offset: Start index
             length: Number of results to return
         """
-        if sessionId not in _active_searches:
+        search = _store.get(sessionId)
+        if search is None:
             return f"[Error: Search '{sessionId}' not found or expired]"
         
-        search = _active_searches[sessionId]
         results = search["results"]
         total = len(results)
         
         selected = results[offset:offset + length]
         remaining = total - offset - len(selected)
         
+        running = not search.get("done", True)
+        
         if not selected:
+            if running:
+                return f"No more results yet ({total} so far, search still running)"
             return f"No more results (showing all {total} total)"
         
-        output = f"Results {offset} to {offset + len(selected) - 1} of {total}\n"
+        output = f"Results {offset} to {offset + len(selected) - 1} of {total}"
+        output += " so far (still searching)\n" if running else "\n"
         if remaining > 0:
             output += f"({remaining} remaining)\n"
         output += "-" * 50 + "\n"
@@ -162,7 +301,7 @@ def register_tools(mcp):
                 output += f"{r['file']}\n"
         else:
             for r in selected:
-                output += f"{r}\n"
+                output += f"{_format_content_result(r)}\n"
         
         return output
 
@@ -174,19 +313,21 @@ def register_tools(mcp):
         Args:
             sessionId: Search ID to stop
         """
-        if sessionId in _active_searches:
-            del _active_searches[sessionId]
+        search = _store.pop(sessionId)
+        if search is not None:
+            _stop(search)
             return f"✅ Search {sessionId} stopped and cleaned up"
         return f"[Warning: Search '{sessionId}' not found]"
 
     @mcp.tool()
     def list_searches() -> str:
         """List all active searches."""
-        if not _active_searches:
+        searches = _store.items()
+        if not searches:
             return "📭 No active searches"
         
         output = "Active Searches:\n" + "=" * 50 + "\n"
-        for sid, search in _active_searches.items():
+        for sid, search in searches:
             count = len(search["results"])
             output += f"\n  {sid}\n"
             output += f"  Pattern: {search['pattern']}\n"
@@ -3,10 +3,15 @@ surgical/formatters.py — indent and unindent tools.
 """
 
 from .helpers import (
-    read_file_lines, atomic_write, generate_diff, post_write_review,
+    read_file_lines, atomic_write, generate_diff_at, post_write_review,
 )
 
 
+def _range_diff(lines: list[str], start: int, old_block: list[str]) -> str:
+    """Diff for lines[start:start+len(old_block)] rewritten in place."""
+    return generate_diff_at(lines, start, old_block, lines[start:start + len(old_block)])
+
+
 def register_tools(mcp):
 
     @mcp.tool()
@@ -14,12 +19,12 @@ def register_tools(mcp):
         """Indent a range of lines by N spaces (0-based, end exclusive)."""
         try:
             lines = read_file_lines(path)
-            old_copy = lines.copy()
+            old_block = lines[start_line:end_line]
             pad = " " * spaces
             for i in range(start_line, min(end_line, len(lines))):
                 lines[i] = pad + lines[i]
             atomic_write(path, lines)
-            diff = generate_diff(old_copy, lines)
+            diff = _range_diff(lines, start_line, old_block)
             out = (f"✅ Indented lines {start_line}–{end_line - 1} by {spaces} spaces\n\n"
                    f"```diff\n{diff}\n```")
             out += post_write_review(path, start_line, end_line)
@@ -32,13 +37,13 @@ def register_tools(mcp):
         """Remove up to N leading spaces from a range of lines (0-based, end exclusive)."""
         try:
             lines = read_file_lines(path)
-            old_copy = lines.copy()
+            old_block = lines[start_line:end_line]
             for i in range(start_line, min(end_line, len(lines))):
                 stripped = lines[i].lstrip(' ')
                 removed = len(lines[i]) - len(stripped)
                 lines[i] = lines[i][min(removed, spaces):]
             atomic_write(path, lines)
-            diff = generate_diff(old_copy, lines)
+            diff = _range_diff(lines, start_line, old_block)
             out = (f"✅ Unindented lines {start_line}–{end_line - 1} by up to {spaces} spaces\n\n"
                    f"```diff\n{diff}\n```")
             out += post_write_review(path, start_line, end_line)
@@ -4,26 +4,145 @@ Includes: file I/O, diff generation, fuzzy matching, line-delta summary,
           AI error analysis, atomic write, and post-write iflow review.
 """
 
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Tuple
 import difflib
+import itertools
 import os
+import re
 import tempfile
 
+try:
+    from rapidfuzz import fuzz as _fuzz, process as _fuzz_process
+    from rapidfuzz.distance import Levenshtein as _Levenshtein
+except ImportError:  # optional: fall back to difflib
+    _fuzz = _fuzz_process = _Levenshtein = None
+
+try:
+    import diff_match_patch as _dmp_module
+except ImportError:  # optional: large diffs fall back to difflib
+    _dmp_module = None
+
 
 # ---------------------------------------------------------------------------
 # File I/O
 # ---------------------------------------------------------------------------
 
+# Parsed line lists of recently used files, keyed by path and validated
+# against (st_mtime_ns, st_size), so a find → replace → replace sequence
+# reads and splits the file once. Writes through this module refresh it.
+_LINE_CACHE_SIZE = 32
+_line_cache: OrderedDict = OrderedDict()
+
+# Line ending of files that use a single non-LF style throughout ("\r\n"
+# or "\r"); their lines are joined with it again when written back
+_newlines: dict[str, str] = {}
+
+
+def _cache_lines(p: Path, lines) -> None:
+    try:
+        st = p.stat()
+    except OSError:
+        _line_cache.pop(str(p), None)
+        return
+    _line_cache[str(p)] = (st.st_mtime_ns, st.st_size, tuple(lines))
+    _line_cache.move_to_end(str(p))
+    while len(_line_cache) > _LINE_CACHE_SIZE:
+        _line_cache.popitem(last=False)
+
+
 def read_file_lines(path: str) -> list[str]:
     p = Path(path).expanduser()
-    if not p.exists():
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {path}")
+    hit = _line_cache.get(str(p))
+    if hit is not None and hit[:2] == (st.st_mtime_ns, st.st_size):
+        _line_cache.move_to_end(str(p))
+        return list(hit[2])  # callers mutate the list they get
+    lines, newline = _split_lines(p.read_bytes().decode("utf-8"))
+    if newline == "\n":
+        _newlines.pop(str(p), None)
+    else:
+        _newlines[str(p)] = newline
+    _cache_lines(p, lines)
+    return lines
+
+
+def _split_lines(text: str) -> Tuple[list[str], str]:
+    """
+    Lines of text and the ending to join them with on write. A single
+    style (LF, CRLF or CR) is split on and restored as is. CRLF mixed with
+    LF is split on LF, so CRLF lines keep their "\r" and every line's
+    ending survives an edit. Lone CRs among other endings get universal
+    newlines (as read_text would) and come back as LF.
+    """
+    crlf = text.count("\r\n")
+    cr = text.count("\r") - crlf
+    if not cr:
+        if crlf and crlf == text.count("\n"):
+            return text.split("\r\n"), "\r\n"
+        return text.split("\n"), "\n"
+    if not crlf and "\n" not in text:
+        return text.split("\r"), "\r"
+    return text.replace("\r\n", "\n").replace("\r", "\n").split("\n"), "\n"
+
+
+# read_line_range streams ranges up to this many lines on a cache miss
+_STREAM_RANGE_MAX = 1000
+
+
+def read_line_range(path: str, start: int, end: int) -> Tuple[list[str], int]:
+    """
+    (lines[start:end], total line count) with read_file_lines' semantics.
+    Served from the line cache when the file is there; otherwise a short
+    range is streamed with islice, without decoding, splitting or caching
+    the rest of the file (its newlines are only counted).
+    """
+    p = Path(path).expanduser()
+    try:
+        st = p.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(f"File not found: {path}")
-    return p.read_text().split("\n")
+    hit = _line_cache.get(str(p))
+    if (start < 0 or end - start > _STREAM_RANGE_MAX
+            or hit is not None and hit[:2] == (st.st_mtime_ns, st.st_size)):
+        lines = read_file_lines(path)
+        return lines[start:end], len(lines)
+
+    # A CR anywhere (even outside the range) can be a line break, and which
+    # endings count depends on the whole file: leave those to read_file_lines
+    newlines, has_cr = 0, False
+    with open(p, "rb") as f:
+        for line in itertools.islice(f, start):
+            newlines += line.endswith(b"\n")
+            has_cr = has_cr or b"\r" in line
+        raw = list(itertools.islice(f, max(0, end - start)))
+        newlines += sum(line.endswith(b"\n") for line in raw)
+        has_cr = has_cr or any(b"\r" in l for l in raw)
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            newlines += chunk.count(b"\n")
+            has_cr = has_cr or b"\r" in chunk
+    if has_cr:
+        lines = read_file_lines(path)
+        return lines[start:end], len(lines)
+    selected = [l.removesuffix(b"\n").decode("utf-8") for l in raw]
+    if len(selected) < end - start and start + len(selected) == newlines:
+        selected.append("")  # the empty last "line" after a trailing newline
+    return selected, newlines + 1
+
+
+def _encode_lines(p: Path, lines: list[str]) -> bytes:
+    return _newlines.get(str(p), "\n").join(lines).encode("utf-8")
 
 
 def write_file_lines(path: str, lines: list[str]) -> None:
-    Path(path).expanduser().write_text("\n".join(lines))
+    p = Path(path).expanduser()
+    p.write_bytes(_encode_lines(p, lines))
+    _cache_lines(p, lines)
 
 
 def atomic_write(path: str, lines: list[str]) -> None:
@@ -31,8 +150,8 @@ def atomic_write(path: str, lines: list[str]) -> None:
     p = Path(path).expanduser()
     tmp_fd, tmp_path = tempfile.mkstemp(dir=p.parent, prefix=".surgical_")
     try:
-        with os.fdopen(tmp_fd, 'w') as f:
-            f.write("\n".join(lines))
+        with os.fdopen(tmp_fd, 'wb') as f:
+            f.write(_encode_lines(p, lines))
         os.replace(tmp_path, p)
     except Exception:
         try:
@@ -40,23 +159,164 @@ def atomic_write(path: str, lines: list[str]) -> None:
         except OSError:
             pass
         raise
+    _cache_lines(p, lines)
 
 
 # ---------------------------------------------------------------------------
 # Diff helpers
 # ---------------------------------------------------------------------------
 
-def generate_diff(old_lines: list[str], new_lines: list[str], context: int = 3) -> str:
-    diff = difflib.unified_diff(old_lines, new_lines,
-                                fromfile='before', tofile='after',
-                                lineterm='', n=context)
-    return '\n'.join(diff)
+_HUNK_RE = re.compile(r"^@@ -(\d+)(.*?) \+(\d+)(.*) @@$")
+
+# Changed windows bigger than this (in characters) are diffed with
+# diff-match-patch's Myers diff when it is installed; SequenceMatcher goes
+# quadratic on large, heavily edited inputs
+_DMP_THRESHOLD = 100_000
+
+
+class _KnownOpcodes(difflib.SequenceMatcher):
+    """SequenceMatcher that only groups opcodes computed elsewhere."""
+
+    def __init__(self, opcodes):
+        self.opcodes = opcodes  # get_opcodes() returns these as-is
+
+
+def _dmp_opcodes(a: list[str], b: list[str]) -> list[tuple]:
+    """difflib-style opcodes for a line diff done by diff-match-patch."""
+    dmp = _dmp_module.diff_match_patch()
+    dmp.Diff_Timeout = 1.0
+    # Line mode: each line becomes one character, so the diff is per line.
+    # Every line gets its "\n" so the last one isn't told apart.
+    chars_a, chars_b, _ = dmp.diff_linesToChars(
+        "".join(l + "\n" for l in a), "".join(l + "\n" for l in b))
+    opcodes, i, j = [], 0, 0
+    for op, chars in dmp.diff_main(chars_a, chars_b, False):
+        k = len(chars)
+        if op == dmp.DIFF_EQUAL:
+            opcodes.append(("equal", i, i + k, j, j + k))
+            i, j = i + k, j + k
+        elif op == dmp.DIFF_DELETE:
+            opcodes.append(("delete", i, i + k, j, j))
+            i += k
+        elif opcodes and opcodes[-1][0] == "delete" and opcodes[-1][2] == i:
+            # delete followed by insert is a replace, as difflib reports it
+            opcodes[-1] = ("replace", opcodes[-1][1], i, j, j + k)
+            j += k
+        else:
+            opcodes.append(("insert", i, i, j, j + k))
+            j += k
+    return opcodes
+
+
+def _unified_diff(a: list[str], b: list[str], opcodes: list[tuple], n: int):
+    """difflib.unified_diff(a, b, 'before', 'after', lineterm='') from opcodes."""
+    started = False
+    for group in _KnownOpcodes(opcodes).get_grouped_opcodes(n):
+        if not started:
+            started = True
+            yield "--- before"
+            yield "+++ after"
+        first, last = group[0], group[-1]
+        yield (f"@@ -{_hunk_range(first[1], last[2] - first[1])} "
+               f"+{_hunk_range(first[3], last[4] - first[3])} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                yield from (" " + l for l in a[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                yield from ("-" + l for l in a[i1:i2])
+            if tag in ("replace", "insert"):
+                yield from ("+" + l for l in b[j1:j2])
+
+
+def generate_diff(old_lines: list[str], new_lines: list[str], context: int = 3,
+                  start_hint: int = 0) -> str:
+    """
+    Unified diff of old_lines -> new_lines. Only the changed window (plus
+    context) is handed to difflib; the unchanged prefix and suffix are
+    trimmed first. start_hint is a line known to precede the first change
+    (callers know where they edited), so the prefix scan can start there.
+    """
+    if old_lines == new_lines:
+        return ""
+    n = min(len(old_lines), len(new_lines))
+    lo = max(0, min(start_hint, n))
+    while lo < n and old_lines[lo] == new_lines[lo]:
+        lo += 1
+    suffix = 0
+    while suffix < n - lo and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+
+    start = max(0, lo - context)
+    a = old_lines[start:len(old_lines) - suffix + context]
+    b = new_lines[start:len(new_lines) - suffix + context]
+    if _dmp_module is not None and sum(map(len, a)) + sum(map(len, b)) > _DMP_THRESHOLD:
+        diff = _unified_diff(a, b, _dmp_opcodes(a, b), context)
+    else:
+        diff = difflib.unified_diff(a, b, fromfile='before', tofile='after',
+                                    lineterm='', n=context)
+    if not start:
+        return '\n'.join(diff)
+
+    def shift(m):
+        return f"@@ -{int(m[1]) + start}{m[2]} +{int(m[3]) + start}{m[4]} @@"
+    return '\n'.join(_HUNK_RE.sub(shift, line) if line.startswith("@@") else line
+                     for line in diff)
+
+
+def _hunk_range(start: int, length: int) -> str:
+    # Same formatting as difflib's unified range
+    if length == 1:
+        return str(start + 1)
+    return f"{start + 1 if length else start},{length}"
+
+
+def generate_diff_at(lines: list[str], start: int, removed: list[str],
+                     inserted: list[str], context: int = 3) -> str:
+    """
+    Unified diff for a single known edit: `removed` (the old lines from
+    `start` on) replaced by `inserted`, with context taken from `lines`,
+    the file before the edit. Renders the one hunk directly, with no copy
+    of the file and no SequenceMatcher pass.
+    """
+    # Lines the edit left as they were don't belong in the hunk
+    n = min(len(removed), len(inserted))
+    head = 0
+    while head < n and removed[head] == inserted[head]:
+        head += 1
+    tail = 0
+    while tail < n - head and removed[-1 - tail] == inserted[-1 - tail]:
+        tail += 1
+    if head == len(removed) == len(inserted):
+        return ""
+    start += head
+    removed = removed[head:len(removed) - tail]
+    inserted = inserted[head:len(inserted) - tail]
+
+    before = lines[max(0, start - context):start]
+    end = start + len(removed)
+    after = lines[end:end + context]
+    first = start - len(before)
+    out = ["--- before", "+++ after",
+           f"@@ -{_hunk_range(first, len(before) + len(removed) + len(after))} "
+           f"+{_hunk_range(first, len(before) + len(inserted) + len(after))} @@"]
+    out.extend(" " + l for l in before)
+    out.extend("-" + l for l in removed)
+    out.extend("+" + l for l in inserted)
+    out.extend(" " + l for l in after)
+    return "\n".join(out)
 
 
 def generate_inline_diff(old: str, new: str) -> str:
-    matcher = difflib.SequenceMatcher(None, old, new)
+    if old == new:
+        return old
+    if _Levenshtein is not None:
+        # Minimal edit script computed in C++; same opcode shape as difflib
+        opcodes = _Levenshtein.opcodes(old, new)
+    else:
+        opcodes = difflib.SequenceMatcher(None, old, new).get_opcodes()
     result = []
-    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+    for op, i1, i2, j1, j2 in opcodes:
         if op == 'equal':
             result.append(old[i1:i2])
         elif op == 'replace':
@@ -72,20 +332,65 @@ def generate_inline_diff(old: str, new: str) -> str:
 # Fuzzy matching
 # ---------------------------------------------------------------------------
 
+# (index, lowered+stripped line) for the non-blank lines of recently searched
+# files, plus their "junk" lines, keyed by the line tuple. read_file_lines
+# hands out the same string objects on a cache hit, so the key compares by
+# identity and repeat fuzzy searches of one file skip the lowercasing pass.
+_LOWER_CACHE_SIZE = 4
+_lower_cache: OrderedDict = OrderedDict()
+
+
+def _lowered(lines: list[str]) -> tuple[tuple[tuple[int, str], ...], frozenset]:
+    key = tuple(lines)
+    hit = _lower_cache.get(key)
+    if hit is not None:
+        _lower_cache.move_to_end(key)
+        return hit
+    lowered = tuple((i, low) for i, low in enumerate(l.lower().strip() for l in lines) if low)
+    # Like difflib's autojunk: in a big file, lines repeated in more than 1%
+    # of it ("}", "end", boilerplate) are noise as fuzzy candidates
+    junk = frozenset()
+    if len(lines) > 200:
+        cap = max(2, len(lines) // 100)
+        junk = frozenset(low for low, c in Counter(low for _, low in lowered).items() if c > cap)
+    _lower_cache[key] = lowered, junk
+    while len(_lower_cache) > _LOWER_CACHE_SIZE:
+        _lower_cache.popitem(last=False)
+    return lowered, junk
+
+
 def find_similar_lines(lines: list[str], target: str,
                        threshold: float = 0.6) -> list[Tuple[int, str, float]]:
     results = []
     target_lower = target.lower().strip()
-    for i, line in enumerate(lines):
-        line_lower = line.lower().strip()
-        if not line_lower:
-            continue
+    # Substring hits score a flat 0.9; everything else is fuzzy-scored below
+    rest_idx, rest = [], []
+    lowered, junk = _lowered(lines)
+    # ratio() <= 2 * shorter / (sum of lengths): lines too short or too long
+    # to reach threshold are never scored
+    t_len = len(target_lower)
+    for i, line_lower in lowered:
         if target_lower in line_lower or line_lower in target_lower:
-            results.append((i, line, 0.9))
-            continue
-        ratio = difflib.SequenceMatcher(None, target_lower, line_lower).ratio()
-        if ratio >= threshold:
-            results.append((i, line, ratio))
+            results.append((i, lines[i], 0.9))
+        elif (line_lower not in junk
+              and 2 * min(len(line_lower), t_len) >= threshold * (len(line_lower) + t_len) - 1e-9):
+            rest_idx.append(i)
+            rest.append(line_lower)
+
+    if _fuzz_process is not None:
+        for _, score, j in _fuzz_process.extract(
+                target_lower, rest, scorer=_fuzz.ratio, processor=None,
+                score_cutoff=threshold * 100, limit=5):
+            results.append((rest_idx[j], lines[rest_idx[j]], score / 100))
+    else:
+        # SequenceMatcher caches its analysis of seq2, so target goes there
+        matcher = difflib.SequenceMatcher(None, b=target_lower)
+        for i, line_lower in zip(rest_idx, rest):
+            matcher.set_seq1(line_lower)
+            if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold:
+                ratio = matcher.ratio()
+                if ratio >= threshold:
+                    results.append((i, lines[i], ratio))
     return sorted(results, key=lambda x: -x[2])[:5]
 
 
@@ -106,25 +411,63 @@ def line_delta_summary(old_count: int, new_count: int, edit_start: int) -> str:
 # AI error analysis (iflow)
 # ---------------------------------------------------------------------------
 
-def ai_analyze_error(error_type: str, context: dict) -> str:
+# Off by default: a failed edit shouldn't wait on an LLM round-trip. When
+# enabled, the analysis runs in the background and the error message
+# carries an id to fetch it with get_ai_analysis().
+_AI_ANALYSIS_ENABLED = os.getenv("TERMPIPE_AI_ERROR_ANALYSIS") == "1"
+_AI_RESULTS_MAX = 64
+_ai_results: OrderedDict = OrderedDict()
+_ai_ids = itertools.count(1)
+_ai_pool: Optional[ThreadPoolExecutor] = None
+
+
+_PROMPT_HEAD = "Code editing error analyst. Error: {error_type}\n"
+_PROMPT_BODIES = {
+    "text_not_found": ("Searched for:\n{searched_for}\n"
+                       "Line {line_number} contains:\n{actual_line}\n"
+                       "Char diff: {char_diff}\n"),
+    "ambiguous": ("Text appears {match_count} times. "
+                  "Lines: {match_lines}. Text: {searched_for:.100}\n"),
+}
+_PROMPT_TAIL = "\nRespond:\n❌ PROBLEM: [one sentence]\n✅ FIX: [one sentence]"
+_PROMPT_DEFAULTS = {"searched_for": "", "line_number": "?", "actual_line": "",
+                    "char_diff": "N/A", "match_count": 0, "match_lines": []}
+
+
+def _ai_analyze_error_sync(error_type: str, context: dict) -> str:
     try:
         from termpipe_mcp.tools.iflow import iflow_query
-        prompt = f"Code editing error analyst. Error: {error_type}\n"
-        if error_type == "text_not_found":
-            prompt += (f"Searched for:\n{context.get('searched_for', '')}\n"
-                       f"Line {context.get('line_number', '?')} contains:\n"
-                       f"{context.get('actual_line', '')}\n"
-                       f"Char diff: {context.get('char_diff', 'N/A')}\n")
-        elif error_type == "ambiguous":
-            prompt += (f"Text appears {context.get('match_count', 0)} times. "
-                       f"Lines: {context.get('match_lines', [])}. "
-                       f"Text: {context.get('searched_for', '')[:100]}\n")
-        prompt += "\nRespond:\n❌ PROBLEM: [one sentence]\n✅ FIX: [one sentence]"
+        ctx = {**_PROMPT_DEFAULTS, **context, "error_type": error_type}
+        prompt = "".join([_PROMPT_HEAD.format_map(ctx),
+                          _PROMPT_BODIES.get(error_type, "").format_map(ctx),
+                          _PROMPT_TAIL])
         return iflow_query(prompt, model="qwen3-coder-plus", max_tokens=150, temperature=0.1)
     except Exception:
         return ""
 
 
+def ai_analyze_error(error_type: str, context: dict) -> str:
+    """Start a background AI analysis; returns a pointer to it ("" if disabled)."""
+    global _ai_pool
+    if not _AI_ANALYSIS_ENABLED:
+        return ""
+    if _ai_pool is None:
+        _ai_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ai-analysis")
+    retrieval_id = f"ai_{next(_ai_ids)}"
+    _ai_results[retrieval_id] = _ai_pool.submit(_ai_analyze_error_sync, error_type, context)
+    while len(_ai_results) > _AI_RESULTS_MAX:
+        _ai_results.popitem(last=False)
+    return f"AI analysis running: get_ai_analysis('{retrieval_id}')"
+
+
+def get_ai_analysis_result(retrieval_id: str, wait: float) -> Optional[str]:
+    """The analysis text; None if unknown; raises TimeoutError if still running."""
+    future = _ai_results.get(retrieval_id)
+    if future is None:
+        return None
+    return future.result(timeout=wait)
+
+
 # ---------------------------------------------------------------------------
 # Post-write iflow review — the crown jewel
 # ---------------------------------------------------------------------------
@@ -187,6 +530,7 @@ def post_write_review(path: str, edit_start: int, edit_end: int) -> str:
             max_tokens=400,
             temperature=0.0,
             timeout=3.0,  # non-blocking: don't stall writes if iflow is slow
+            max_retries=0,
         ).strip()
 
         if not response or response.upper() == "CLEAN":
@@ -1,11 +1,52 @@
 """
 surgical/readers.py — read-only surgical tools.
-Tools: read_lines, find_in_file, read_multiple_files
+Tools: read_lines, find_in_file, read_multiple_files, get_ai_analysis
 """
 
+import re
 from pathlib import Path
 from typing import Optional
-from .helpers import read_file_lines, find_similar_lines
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from .helpers import (
+    read_file_lines, read_line_range, find_similar_lines, get_ai_analysis_result,
+)
+
+
+def _matching_lines(text: str, pattern: str, limit: int) -> list[int]:
+    """
+    Numbers of the first `limit` lines containing pattern (case-insensitive).
+    One regex scan over the whole text; after a hit it resumes at the next
+    line, and line numbers come from counting newlines between hits.
+    """
+    regex = re.compile(re.escape(pattern), re.IGNORECASE)
+    matches, line_no, pos = [], 0, 0
+    while len(matches) < limit:
+        m = regex.search(text, pos)
+        if m is None:
+            break
+        line_no += text.count("\n", pos, m.start())
+        matches.append(line_no)
+        pos = text.find("\n", m.start()) + 1
+        if pos == 0:  # hit was on the last line
+            break
+        line_no += 1
+    return matches
+
+
+_IMAGE_SUFFIXES = frozenset({'.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp'})
+
+
+def _read_one(path: str) -> str:
+    """One read_multiple_files section: header plus contents (or error)."""
+    p = Path(path).expanduser()
+    try:
+        if p.suffix.lower() in _IMAGE_SUFFIXES:
+            # Only the encoded length is reported, and that follows from the size
+            b64_len = (p.stat().st_size + 2) // 3 * 4
+            return f"=== {path} ===\n[Image: {p.suffix} ({b64_len} bytes)]\n"
+        return f"=== {path} ===\n{p.read_text()}\n"
+    except Exception as e:
+        return f"=== {path} ===\n[Error: {e}]\n"
 
 
 def register_tools(mcp):
@@ -14,15 +55,14 @@ def register_tools(mcp):
     def read_lines(path: str, start_line: int, end_line: Optional[int] = None) -> str:
         """Read specific line range from a file (0-based)."""
         try:
-            lines = read_file_lines(path)
             if end_line is None:
                 end_line = start_line + 1
-            if start_line < 0 or start_line >= len(lines):
-                return f"[Error: Line {start_line} out of range (file has {len(lines)} lines)]"
-            output = f"Lines {start_line}-{min(end_line, len(lines))-1} of {path} (total: {len(lines)}):\n\n"
-            for i, line in enumerate(lines[start_line:end_line], start_line):
-                output += f"{i:4d} | {line}\n"
-            return output
+            selected, total = read_line_range(path, start_line, end_line)
+            if start_line < 0 or start_line >= total:
+                return f"[Error: Line {start_line} out of range (file has {total} lines)]"
+            header = f"Lines {start_line}-{min(end_line, total)-1} of {path} (total: {total}):\n\n"
+            return header + "".join(
+                f"{i:4d} | {line}\n" for i, line in enumerate(selected, start_line))
         except Exception as e:
             return f"[Error: {e}]"
 
@@ -32,8 +72,7 @@ def register_tools(mcp):
         """Find pattern in file with line numbers and optional context lines."""
         try:
             lines = read_file_lines(path)
-            matches = [i for i, l in enumerate(lines)
-                       if pattern.lower() in l.lower()][:max_matches]
+            matches = _matching_lines("\n".join(lines), pattern, max_matches)
             if not matches:
                 similar = find_similar_lines(lines, pattern)
                 if similar:
@@ -42,33 +81,39 @@ def register_tools(mcp):
                                 f"  Line {i} ({s:.0%}): {l.strip()[:60]}"
                                 for i, l, s in similar))
                 return f"No matches for: {pattern}"
-            out = f"Found {len(matches)} match(es) for '{pattern}' (file: {len(lines)} lines):\n\n"
+            parts = [f"Found {len(matches)} match(es) for '{pattern}' (file: {len(lines)} lines):\n\n"]
             for m in matches:
                 if context > 0:
                     s, e = max(0, m - context), min(len(lines), m + context + 1)
-                    out += f"--- Line {m} ---\n"
-                    for i in range(s, e):
-                        out += f"{'→' if i == m else ' '} {i:4d} | {lines[i]}\n"
-                    out += "\n"
+                    parts.append(f"--- Line {m} ---\n")
+                    parts.extend(f"{'→' if i == m else ' '} {i:4d} | {lines[i]}\n"
+                                 for i in range(s, e))
+                    parts.append("\n")
                 else:
-                    out += f"Line {m}: {lines[m].strip()[:80]}\n"
-            return out
+                    parts.append(f"Line {m}: {lines[m].strip()[:80]}\n")
+            return "".join(parts)
         except Exception as e:
             return f"[Error: {e}]"
 
     @mcp.tool()
     def read_multiple_files(paths: list[str]) -> str:
         """Read contents of multiple files at once."""
-        results = []
-        for path in paths:
-            p = Path(path).expanduser()
-            try:
-                if p.suffix.lower() in ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp']:
-                    import base64
-                    b64 = base64.b64encode(p.read_bytes()).decode()
-                    results.append(f"=== {path} ===\n[Image: {p.suffix} ({len(b64)} bytes)]\n")
-                else:
-                    results.append(f"=== {path} ===\n{p.read_text()}\n")
-            except Exception as e:
-                results.append(f"=== {path} ===\n[Error: {e}]\n")
-        return "\n".join(results)
+        if not paths:
+            return ""
+        # Reads release the GIL, so files load in parallel; map keeps input order
+        with ThreadPoolExecutor(max_workers=min(32, len(paths))) as pool:
+            return "\n".join(pool.map(_read_one, paths))
+
+    @mcp.tool()
+    def get_ai_analysis(retrieval_id: str, wait_seconds: float = 10) -> str:
+        """
+        Fetch the AI analysis of a failed edit (enabled with
+        TERMPIPE_AI_ERROR_ANALYSIS=1; the error message gives the id).
+        """
+        try:
+            result = get_ai_analysis_result(retrieval_id, wait_seconds)
+        except FutureTimeout:
+            return f"⏳ Analysis {retrieval_id} still running — try again shortly"
+        if result is None:
+            return f"[Error: No analysis with id '{retrieval_id}']"
+        return f"🤖 {result}" if result else "[No analysis available]"
@@ -6,7 +6,7 @@ Both call post_write_review() after committing changes.
 from pathlib import Path
 from typing import Optional
 from .helpers import (
-    read_file_lines, atomic_write, generate_diff,
+    read_file_lines, atomic_write, generate_diff_at,
     find_similar_lines, line_delta_summary,
     ai_analyze_error, post_write_review,
 )
@@ -25,19 +25,23 @@ def register_tools(mcp):
         Idempotent: if old_text absent but new_text already present → returns success.
         Calls iflow post-write review to catch any introduced duplicates.
         """
+        if old_text == new_text:
+            return "ℹ️  No-op: old_text and new_text are identical. File was NOT modified."
         try:
             lines = read_file_lines(path)
             content = "\n".join(lines)
+            first = content.find(old_text)
 
-            if old_text not in content:
+            if first == -1:
                 if new_text in content and new_text != old_text:
                     return ("✅ Already done (old_text not found, new_text already present)\n"
                             "ℹ️  File was NOT modified.")
-                error = f"[Error: Text not found]\n🔍 Searched: {old_text[:100]}\n"
+                error = [f"[Error: Text not found]\n🔍 Searched: {old_text[:100]}\n"]
                 similar = find_similar_lines(lines, old_text.split("\n")[0])
                 if similar:
-                    error += "💡 Similar:\n" + "\n".join(
-                        f"  Line {i} ({s:.0%}): {l.strip()[:60]}" for i, l, s in similar)
+                    error.append("💡 Similar:\n")
+                    error.append("\n".join(
+                        f"  Line {i} ({s:.0%}): {l.strip()[:60]}" for i, l, s in similar))
                 ai = ai_analyze_error("text_not_found", {
                     "searched_for": old_text[:200],
                     "line_number": similar[0][0] if similar else "N/A",
@@ -45,26 +49,20 @@ def register_tools(mcp):
                     "char_diff": "N/A",
                 })
                 if ai:
-                    error += f"\n🤖 {ai}"
-                return error
+                    error.append(f"\n🤖 {ai}")
+                return "".join(error)
 
-            occ_count = content.count(old_text)
+            # A second (non-overlapping) hit is enough to know it's ambiguous;
+            # only then is the whole file scanned for the full list
+            second = content.find(old_text, first + max(len(old_text), 1))
 
-            if occ_count > 1:
-                occ_lines, search_pos = [], 0
-                for _ in range(occ_count):
-                    pos = content.find(old_text, search_pos)
-                    if pos == -1:
-                        break
-                    occ_lines.append(content[:pos].count("\n"))
-                    search_pos = pos + 1
+            if second != -1:
+                occurrences = _occurrences(content, old_text, first)
+                occ_count = len(occurrences)
+                occ_lines = [line_no for _, line_no in occurrences]
 
                 if expected_line is not None and expected_line in occ_lines:
-                    occ_idx = occ_lines.index(expected_line)
-                    search_pos = 0
-                    for i in range(occ_idx + 1):
-                        pos = content.find(old_text, search_pos)
-                        search_pos = pos + 1
+                    pos = occurrences[occ_lines.index(expected_line)][0]
                     new_content = content[:pos] + new_text + content[pos + len(old_text):]
                     new_lines = new_content.split("\n")
                     old_count = len(lines)
@@ -75,7 +73,7 @@ def register_tools(mcp):
                         note = f"\n🤖 reviewer: {rev.note}" if rev.note else ""
                         return f"✅ Replaced occurrence at line {expected_line} (reviewer corrected){note}"
                     atomic_write(path, new_lines)
-                    diff = generate_diff(lines, new_lines)
+                    diff = _span_diff(lines, new_lines, expected_line, old_text, new_text)
                     edit_end = expected_line + len(new_text.split("\n"))
                     out = (f"✅ Replaced occurrence at line {expected_line}\n"
                            f"{line_delta_summary(old_count, len(new_lines), expected_line)}\n\n"
@@ -85,20 +83,18 @@ def register_tools(mcp):
                     out += post_write_review(path, expected_line, edit_end)
                     return out
                 else:
-                    out = f"[Ambiguous: {occ_count} occurrences on lines: {occ_lines[:10]}]\n"
-                    out += "💡 Rerun with expected_line=<N> to target one.\n"
                     ai = ai_analyze_error("ambiguous", {
                         "match_count": occ_count, "match_lines": occ_lines[:10],
                         "searched_for": old_text[:100],
                     })
-                    if ai:
-                        out += f"🤖 {ai}"
-                    return out
+                    return (f"[Ambiguous: {occ_count} occurrences on lines: {occ_lines[:10]}]\n"
+                            "💡 Rerun with expected_line=<N> to target one.\n"
+                            + (f"🤖 {ai}" if ai else ""))
 
             # Unique occurrence
             old_count = len(lines)
-            start_line_no = content[:content.find(old_text)].count("\n")
-            new_content = content.replace(old_text, new_text, 1)
+            start_line_no = content.count("\n", 0, first)
+            new_content = content[:first] + new_text + content[first + len(old_text):]
             new_lines = new_content.split("\n")
 
             # Verify before atomic write
@@ -119,7 +115,7 @@ def register_tools(mcp):
                 return f"✅ Replaced at line {start_line_no} (reviewer corrected){note}"
             atomic_write(path, new_lines)
             edit_end = start_line_no + len(new_text.split("\n"))
-            diff = generate_diff(lines, new_lines)
+            diff = _span_diff(lines, new_lines, start_line_no, old_text, new_text)
             out = (f"✅ Replaced at line {start_line_no}\n"
                    f"{line_delta_summary(old_count, len(new_lines), start_line_no)}\n\n"
                    f"```diff\n{diff}\n```")
@@ -157,13 +153,12 @@ def register_tools(mcp):
             else:
                 processed = _remove_basic_duplicates(target)
 
-            old_copy = lines.copy()
-            lines = prefix + processed + suffix
-            atomic_write(path, lines)
+            new_lines = prefix + processed + suffix
+            atomic_write(path, new_lines)
             removed = len(target) - len(processed)
-            diff = generate_diff(old_copy, lines)
+            diff = generate_diff_at(lines, start_line, target, processed)
             out = (f"✅ Removed {removed} duplicate(s)\n"
-                   f"{line_delta_summary(old_count, len(lines), start_line)}\n\n"
+                   f"{line_delta_summary(old_count, len(new_lines), start_line)}\n\n"
                    f"```diff\n{diff}\n```")
             out += post_write_review(path, start_line, start_line + len(processed))
             return out
@@ -171,6 +166,31 @@ def register_tools(mcp):
             return f"[Error: {e}]"
 
 
+def _span_diff(lines: list[str], new_lines: list[str], line_no: int,
+               old_text: str, new_text: str) -> str:
+    """Diff for old_text → new_text starting on line_no (lines it touches only)."""
+    removed = lines[line_no:line_no + old_text.count("\n") + 1]
+    inserted = new_lines[line_no:line_no + new_text.count("\n") + 1]
+    return generate_diff_at(lines, line_no, removed, inserted)
+
+
+def _occurrences(text: str, needle: str, first: int = 0) -> list[tuple[int, int]]:
+    """
+    (offset, line number) of every non-overlapping occurrence of needle,
+    which may span lines. One str.find pass from `first` (a known first
+    hit); line numbers come from counting newlines between hits.
+    """
+    result = []
+    step = max(len(needle), 1)
+    pos, line_no, prev = text.find(needle, first), 0, 0
+    while pos != -1:
+        line_no += text.count("\n", prev, pos)
+        result.append((pos, line_no))
+        prev = pos
+        pos = text.find(needle, pos + step)
+    return result
+
+
 def _remove_basic_duplicates(lines: list[str]) -> list[str]:
     if not lines:
         return lines
@@ -153,6 +153,7 @@ def _register_iflow(model: str = "qwen3-coder-plus"):
             max_tokens=600,
             temperature=0.0,
             timeout=int(timeout),
+            max_retries=0,  # the gate's timeout is the whole budget
         )
 
     register_reviewer("iflow", _fn)
@@ -6,7 +6,7 @@ Every tool calls post_write_review() after committing changes.
 
 from typing import Optional
 from .helpers import (
-    read_file_lines, atomic_write, generate_diff,
+    read_file_lines, atomic_write, generate_diff_at,
     generate_inline_diff, find_similar_lines,
     line_delta_summary, ai_analyze_error, post_write_review,
 )
@@ -23,18 +23,16 @@ def register_tools(mcp):
             old_count = len(lines)
             new_lines_in = content.split("\n")
             line_number = max(0, min(line_number, len(lines)))
-            old_copy = lines.copy()
             new_lines_list = lines[:line_number] + new_lines_in + lines[line_number:]
             edit_end = line_number + len(new_lines_in)
-            rev = pre_commit_gate(path, old_copy, line_number, line_number, "", content)
+            rev = pre_commit_gate(path, lines, line_number, line_number, "", content)
             if rev.reviewer_wrote:
                 note = f"\n🤖 reviewer: {rev.note}" if rev.note else ""
                 return f"✅ Inserted {len(new_lines_in)} line(s) before line {line_number} (reviewer corrected){note}"
             atomic_write(path, new_lines_list)
-            lines = new_lines_list
-            diff = generate_diff(old_copy, lines)
+            diff = generate_diff_at(lines, line_number, [], new_lines_in)
             out = (f"✅ Inserted {len(new_lines_in)} line(s) before line {line_number}\n"
-                   f"{line_delta_summary(old_count, len(lines), line_number)}\n\n"
+                   f"{line_delta_summary(old_count, len(new_lines_list), line_number)}\n\n"
                    f"```diff\n{diff}\n```")
             if rev.note:
                 out += f"\n🤖 reviewer: {rev.note}"
@@ -61,12 +59,12 @@ def register_tools(mcp):
                 return out
             lines = new_lines_del
             atomic_write(path, lines)
-            out = f"✅ Deleted {len(deleted)} line(s) ({start_line}–{end_line - 1})\n"
-            out += line_delta_summary(old_count, len(lines), start_line) + "\n\n"
-            out += "🗑️ Deleted:\n```\n"
-            for i, l in enumerate(deleted, start_line):
-                out += f"{i:4d} | {l}\n"
-            out += "```"
+            parts = [f"✅ Deleted {len(deleted)} line(s) ({start_line}–{end_line - 1})\n",
+                     line_delta_summary(old_count, len(lines), start_line), "\n\n",
+                     "🗑️ Deleted:\n```\n"]
+            parts.extend(f"{i:4d} | {l}\n" for i, l in enumerate(deleted, start_line))
+            parts.append("```")
+            out = "".join(parts)
             # post-review on the region just above/below deletion point
             out += post_write_review(path, max(0, start_line - 1), start_line + 1)
             return out
@@ -84,21 +82,22 @@ def register_tools(mcp):
             if end_line < start_line:
                 return "[Error: end_line must be >= start_line]"
             new_lines_in = content.split("\n")
-            old_copy = lines.copy()
+            if new_lines_in == lines[start_line:end_line]:
+                return f"ℹ️  No-op: lines {start_line}–{end_line - 1} already match. File was NOT modified."
             old_replaced = end_line - start_line
             old_block = "\n".join(lines[start_line:end_line])
-            rev = pre_commit_gate(path, old_copy, start_line, end_line, old_block, content)
+            rev = pre_commit_gate(path, lines, start_line, end_line, old_block, content)
             if rev.reviewer_wrote:
                 note = f"\n🤖 reviewer: {rev.note}" if rev.note else ""
                 return (f"✅ Replaced lines {start_line}–{end_line - 1} "
                         f"({old_replaced} → {len(new_lines_in)} lines) (reviewer corrected){note}")
-            lines = lines[:start_line] + new_lines_in + lines[end_line:]
-            atomic_write(path, lines)
+            new_lines = lines[:start_line] + new_lines_in + lines[end_line:]
+            atomic_write(path, new_lines)
             edit_end = start_line + len(new_lines_in)
-            diff = generate_diff(old_copy, lines)
+            diff = generate_diff_at(lines, start_line, lines[start_line:end_line], new_lines_in)
             out = (f"✅ Replaced lines {start_line}–{end_line - 1} "
                    f"({old_replaced} → {len(new_lines_in)} lines)\n"
-                   f"{line_delta_summary(old_count, len(lines), start_line)}\n\n"
+                   f"{line_delta_summary(old_count, len(new_lines), start_line)}\n\n"
                    f"```diff\n{diff}\n```")
             out += post_write_review(path, start_line, edit_end)
             return out
@@ -110,6 +109,8 @@ def register_tools(mcp):
                         old_text: str, new_text: str,
                         replace_all: bool = False) -> str:
         """Replace text within a specific line (0-based). Most surgical tool."""
+        if old_text == new_text:
+            return "ℹ️  No-op: old_text and new_text are identical. File was NOT modified."
         try:
             lines = read_file_lines(path)
             if line_number < 0 or line_number >= len(lines):
@@ -118,16 +119,16 @@ def register_tools(mcp):
                         f"💡 Use find_in_file('{path}', '{old_text[:40]}') to locate.")
             line = lines[line_number]
             if old_text not in line:
-                error = (f"[Error: Text not found on line {line_number}]\n"
-                         f"📍 Line contains: {line}\n🔍 Searched: {old_text}\n")
-                matches = [(i, l.strip()[:60]) for i, l in enumerate(lines) if old_text in l]
+                error = [f"[Error: Text not found on line {line_number}]\n"
+                         f"📍 Line contains: {line}\n🔍 Searched: {old_text}\n"]
+                matches = [i for i, l in enumerate(lines) if old_text in l]
                 if matches:
-                    error += "💡 Found on: " + ", ".join(f"line {i}" for i, _ in matches[:5])
+                    error.append("💡 Found on: " + ", ".join(f"line {i}" for i in matches[:5]))
                 else:
                     similar = find_similar_lines(lines, old_text)
                     if similar:
-                        error += "💡 Similar: " + ", ".join(
-                            f"line {i} ({s:.0%})" for i, _, s in similar[:3])
+                        error.append("💡 Similar: " + ", ".join(
+                            f"line {i} ({s:.0%})" for i, _, s in similar[:3]))
                 ai = ai_analyze_error("text_not_found", {
                     "searched_for": old_text, "line_number": line_number,
                     "actual_line": line,
@@ -135,8 +136,8 @@ def register_tools(mcp):
                                   if line.strip() else "N/A"),
                 })
                 if ai:
-                    error += f"\n🤖 {ai}"
-                return error
+                    error.append(f"\n🤖 {ai}")
+                return "".join(error)
             count = line.count(old_text)
             old_line = line
             new_line = line.replace(old_text, new_text) if (replace_all or count == 1) \
@@ -6,7 +6,10 @@ import os
 import importlib
 import sys
 import platform
+import time
+from collections import deque
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 from typing import Optional
 try:
@@ -15,21 +18,173 @@ except ImportError:
     from helpers import TERMPIPE_DIR, CONFIG_PATH
 
 
-# Tool call history tracking
-_tool_call_history = []
+# Tool call history tracking (oldest entries drop off in O(1))
+_HISTORY_RING = 1000
+_tool_call_history: deque = deque(maxlen=_HISTORY_RING)
+_tool_call_seq = 0  # bumped on every log; keys _recent_history_cache
+_recent_history_cache: dict[tuple, str] = {}
 
 
 def log_tool_call(tool_name: str, args: dict, result: str):
     """Log a tool call for history tracking."""
+    global _tool_call_seq
+    _tool_call_seq += 1
     _tool_call_history.append({
-        "timestamp": datetime.now().isoformat(),
+        "ts": time.time(),  # formatted only when shown
         "tool": tool_name,
         "args": args,
         "result_preview": result[:200] if result else ""
     })
-    # Keep only last 1000
-    if len(_tool_call_history) > 1000:
-        _tool_call_history.pop(0)
+
+
+def _recent_calls(n: int) -> list:
+    """Last n in-memory history entries, oldest first (deques don't slice)."""
+    recent = list(islice(reversed(_tool_call_history), max(0, n)))  # O(n), not O(len)
+    recent.reverse()
+    return recent
+
+
+def _recent_history_str(n: int = 5, bullet: str = "•", result_label: str = "→") -> str:
+    """
+    "Recent tool calls:" block for the debug assistants (last n calls, with
+    the result shown only for errors). Memoized until the next log_tool_call.
+    """
+    key = (_tool_call_seq, n, bullet, result_label)
+    cached = _recent_history_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    parts = ["Recent tool calls:\n"]
+    for call in _recent_calls(n):
+        result_preview = call.get('result_preview', '')[:150]
+        parts.append(f"  {bullet} {call['tool']}({call['args']})\n")
+        if 'Error' in result_preview or 'error' in result_preview:
+            parts.append(f"    {result_label} {result_preview}\n")
+    history_str = "".join(parts)
+    
+    if len(_recent_history_cache) >= 4:
+        _recent_history_cache.clear()
+    _recent_history_cache[key] = history_str
+    return history_str
+
+
+# Module-name → category label mapping for list_tools
+_MODULE_CATEGORY = {
+    "process":      "PROCESS",
+    "termf":        "TERMF",
+    "iflow":        "IFLOW",
+    "files":        "FILE",
+    "surgical":     "SURGICAL",
+    "apps":         "APPS",
+    "wbind":        "WBIND",
+    "search":       "SEARCH",
+    "thread":       "THREAD",
+    "system":       "SYSTEM",
+    "debug":        "DEBUG",
+    "gemini_debug": "GEMINI",
+    "web_search":   "WEB_SEARCH",
+    "gtt":          "GTT",
+}
+
+# Rendered list_tools output keyed by (registered tool names, category, schemas)
+_list_tools_cache: dict[tuple, str] = {}
+
+
+def _tools_by_category(raw: dict) -> dict[str, list[str]]:
+    tools_by_category: dict[str, list[str]] = {}
+    for tool_name in sorted(raw.keys()):
+        # Resolve which module registered it via __module__ on the fn
+        fn = getattr(raw[tool_name], 'fn', None)
+        mod = ""
+        if fn:
+            # __module__ like "termpipe_mcp.tools.surgical.readers"
+            mod_full = getattr(fn, '__module__', '')
+            mod = mod_full.split('.')[-1] if mod_full else ''
+        cat = _MODULE_CATEGORY.get(mod, mod.upper() or "OTHER")
+        tools_by_category.setdefault(cat, []).append(tool_name)
+    return tools_by_category
+
+
+def _schema_for(tool_obj) -> dict:
+    """Extract JSON schema for a tool's parameters."""
+    import inspect
+    import types as _types
+    import typing
+    try:
+        fn = getattr(tool_obj, 'fn', None)
+        if fn is None:
+            return {}
+        sig = inspect.signature(fn)
+        props = {}
+        required = []
+        hints = fn.__annotations__ if hasattr(fn, '__annotations__') else {}
+        for pname, param in sig.parameters.items():
+            if pname in ('self', 'return'):
+                continue
+            hint = hints.get(pname, None)
+            ptype = "string"
+            if hint is not None:
+                origin = getattr(hint, '__origin__', None)
+                args = getattr(hint, '__args__', ())
+                # Python 3.10+ uses types.UnionType for X | Y; older uses typing.Union
+                _is_union = (
+                    origin is getattr(typing, 'Union', None)
+                    or isinstance(hint, _types.UnionType)  # 3.10+
+                )
+                if hint in (int,) or (origin is None and hint == int): ptype = "integer"
+                elif hint in (bool,): ptype = "boolean"
+                elif hint in (float,): ptype = "number"
+                elif origin is list: ptype = "array"
+                elif _is_union:
+                    non_none = [a for a in args if a is not type(None)]
+                    if non_none:
+                        ptype = {int: "integer", bool: "boolean", float: "number", str: "string"}.get(non_none[0], "string")
+            prop = {"type": ptype}
+            if param.default is inspect.Parameter.empty:
+                required.append(pname)
+            else:
+                prop["default"] = None if param.default is None else param.default
+            props[pname] = prop
+        schema = {"type": "object", "properties": props}
+        if required:
+            schema["required"] = required
+        return schema
+    except Exception:
+        return {}
+
+
+def _render_tools(raw: dict, category: Optional[str], filter_cat: Optional[str],
+                  include_schemas: bool) -> str:
+    """list_tools output for the given registry snapshot."""
+    import json as _json
+    tools_by_category = _tools_by_category(raw)
+
+    if filter_cat:
+        if filter_cat not in tools_by_category:
+            available = ", ".join(sorted(tools_by_category.keys()))
+            return f"[Error: Unknown category '{category}']. Available: {available}"
+        tools = tools_by_category[filter_cat]
+        parts = [f"Category: {filter_cat} ({len(tools)} tools)\n\n"]
+        for t in tools:
+            parts.append(f"  - {t}\n")
+            if include_schemas:
+                parts.append(f"    schema: {_json.dumps(_schema_for(raw[t]))}\n")
+        return "".join(parts)
+
+    parts = ["TermPipe MCP Tools (Modular v2.3 — live registry)\n", "=" * 50 + "\n\n"]
+    total = 0
+    for cat_name in sorted(tools_by_category.keys()):
+        tools = tools_by_category[cat_name]
+        total += len(tools)
+        parts.append(f"{cat_name} ({len(tools)} tools)\n")
+        for t in tools:
+            parts.append(f"   - {t}\n")
+            if include_schemas:
+                parts.append(f"     schema: {_json.dumps(_schema_for(raw[t]))}\n")
+        parts.append("\n")
+    parts.append(f"Total: {total} tools\n\n")
+    parts.append("Use list_tools(category='surgical') for a specific category")
+    return "".join(parts)
 
 
 def register_tools(mcp):
@@ -79,16 +234,17 @@ def register_tools(mcp):
         Args:
             limit: Number of recent calls to return
         """
-        if not _tool_call_history:
+        recent = _recent_calls(limit)
+        if not recent:
             return "📭 No tool calls recorded yet"
+        recent.reverse()  # newest first
         
-        recent = _tool_call_history[-limit:]
-        
-        output = f"Recent Tool Calls (last {min(limit, len(_tool_call_history))}):\n"
+        output = f"Recent Tool Calls (last {len(recent)}):\n"
         output += "=" * 50 + "\n"
         
-        for call in reversed(recent):
-            output += f"\n{call['timestamp']}: {call['tool']}\n"
+        for call in recent:
+            when = datetime.fromtimestamp(call['ts']).isoformat()
+            output += f"\n{when}: {call['tool']}\n"
             output += f"  Args: {call['args']}\n"
         
         return output
@@ -102,122 +258,23 @@ def register_tools(mcp):
             category: Filter by category name, or 'all' / omit for everything.
             include_schemas: If True, include full JSON parameter schemas for each tool.
         """
-        # Module-name → category label mapping
-        MODULE_CATEGORY = {
-            "process":      "PROCESS",
-            "termf":        "TERMF",
-            "iflow":        "IFLOW",
-            "files":        "FILE",
-            "surgical":     "SURGICAL",
-            "apps":         "APPS",
-            "wbind":        "WBIND",
-            "search":       "SEARCH",
-            "thread":       "THREAD",
-            "system":       "SYSTEM",
-            "debug":        "DEBUG",
-            "gemini_debug": "GEMINI",
-            "web_search":   "WEB_SEARCH",
-            "gtt":          "GTT",
-        }
-
-        # Build registry dynamically from FastMCP internals
-        tools_by_category: dict[str, list[str]] = {}
         try:
-            # FastMCP stores tools in ._tool_manager.tools (dict name->tool)
+            # FastMCP stores tools in ._tool_manager._tools (dict name->tool)
             raw = mcp._tool_manager._tools  # {tool_name: Tool}
-            for tool_name in sorted(raw.keys()):
-                # Resolve which module registered it via __module__ on the fn
-                fn = getattr(raw[tool_name], 'fn', None)
-                mod = ""
-                if fn:
-                    qname = getattr(fn, '__qualname__', '')
-                    # qualname like "register_tools.<locals>.read_lines"
-                    # __module__ like "tools.surgical"
-                    mod_full = getattr(fn, '__module__', '')
-                    mod = mod_full.split('.')[-1] if mod_full else ''
-                cat = MODULE_CATEGORY.get(mod, mod.upper() or "OTHER")
-                tools_by_category.setdefault(cat, []).append(tool_name)
         except Exception as e:
             return f"[Error reading live registry: {e}]\nFalling back — restart server to refresh."
 
-        import inspect, json as _json
-
-        def _schema_for(tool_name):
-            """Extract JSON schema for a tool's parameters."""
-            try:
-                tool_obj = raw[tool_name]
-                fn = getattr(tool_obj, 'fn', None)
-                if fn is None:
-                    return {}
-                sig = inspect.signature(fn)
-                props = {}
-                required = []
-                hints = fn.__annotations__ if hasattr(fn, '__annotations__') else {}
-                for pname, param in sig.parameters.items():
-                    if pname in ('self', 'return'):
-                        continue
-                    hint = hints.get(pname, None)
-                    ptype = "string"
-                    if hint is not None:
-                        import types as _types
-                        origin = getattr(hint, '__origin__', None)
-                        args = getattr(hint, '__args__', ())
-                        # Python 3.10+ uses types.UnionType for X | Y; older uses typing.Union
-                        _is_union = (
-                            origin is getattr(__import__('typing'), 'Union', None)
-                            or isinstance(hint, _types.UnionType)  # 3.10+
-                        )
-                        if hint in (int,) or (origin is None and hint == int): ptype = "integer"
-                        elif hint in (bool,): ptype = "boolean"
-                        elif hint in (float,): ptype = "number"
-                        elif origin is list: ptype = "array"
-                        elif _is_union:
-                            non_none = [a for a in args if a is not type(None)]
-                            if non_none:
-                                ptype = {int: "integer", bool: "boolean", float: "number", str: "string"}.get(non_none[0], "string")
-                    prop = {"type": ptype}
-                    if param.default is inspect.Parameter.empty:
-                        required.append(pname)
-                    else:
-                        prop["default"] = None if param.default is None else param.default
-                    props[pname] = prop
-                schema = {"type": "object", "properties": props}
-                if required:
-                    schema["required"] = required
-                return schema
-            except Exception:
-                return {}
-
         filter_cat = category.upper() if category and category.lower() != "all" else None
-
-        if filter_cat:
-            if filter_cat not in tools_by_category:
-                available = ", ".join(sorted(tools_by_category.keys()))
-                return f"[Error: Unknown category '{category}']. Available: {available}"
-            tools = tools_by_category[filter_cat]
-            out = f"Category: {filter_cat} ({len(tools)} tools)\n\n"
-            for t in tools:
-                out += f"  - {t}\n"
-                if include_schemas:
-                    schema = _schema_for(t)
-                    out += f"    schema: {_json.dumps(schema)}\n"
-            return out
-
-        out = "TermPipe MCP Tools (Modular v2.3 — live registry)\n"
-        out += "=" * 50 + "\n\n"
-        total = 0
-        for cat_name in sorted(tools_by_category.keys()):
-            tools = tools_by_category[cat_name]
-            total += len(tools)
-            out += f"{cat_name} ({len(tools)} tools)\n"
-            for t in tools:
-                out += f"   - {t}\n"
-                if include_schemas:
-                    schema = _schema_for(t)
-                    out += f"     schema: {_json.dumps(schema)}\n"
-            out += "\n"
-        out += f"Total: {total} tools\n\n"
-        out += "Use list_tools(category='surgical') for a specific category"
+        # The rendering only changes when tools are (un)registered
+        key = (tuple(raw), filter_cat, include_schemas)
+        out = _list_tools_cache.get(key)
+        if out is None:
+            out = _render_tools(raw, category, filter_cat, include_schemas)
+            # Errors echo the caller's own spelling of category: not shared
+            if not out.startswith("[Error"):
+                if len(_list_tools_cache) >= 32:
+                    _list_tools_cache.clear()
+                _list_tools_cache[key] = out
         return out
 
     @mcp.tool()
@@ -260,6 +317,7 @@ def register_tools(mcp):
             except Exception as e:
                 results.append(f"❌ re-register {mod.__name__}: {e}")
 
+        _list_tools_cache.clear()  # same names, possibly new signatures
         tool_count = len(getattr(mcp._tool_manager, '_tools', {}))
         results.append(f"\n✅ Done — {tool_count} tools live")
         return "\n".join(results)
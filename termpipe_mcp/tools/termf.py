@@ -2,11 +2,94 @@
 TermF command execution tools for TermPipe MCP Server.
 """
 
+import os
+import re
+import shlex
+import shutil
 import subprocess
 from typing import Optional
 from termpipe_mcp.helpers import api_post
+from termpipe_mcp.tools.debug import analyze_and_suggest_fix
 from termpipe_mcp.tools.process import process_manager
 
+# `<binary> --help` output by resolved path, with the binary's mtime, so a
+# command that keeps failing doesn't re-run its help every time
+_HELP_CACHE: dict[str, tuple[float, str]] = {}
+
+# Shell builtins and keywords: no binary to ask for --help
+_SHELL_BUILTINS = frozenset({
+    "cd", "export", "source", ".", "alias", "unalias", "set", "unset",
+    "eval", "exec", "exit", "read", "ulimit", "umask", "if", "for", "while",
+})
+
+
+# termf_exec's response for the common case: success, stdout, no stderr
+_OK_TMPL = "Status: Success (Exit Code: {ec})\\nDuration: {dur:.4f}s\\nOutput:\\n{out}\\n"
+
+# Exit codes that report a result rather than a failure (grep: no match,
+# diff/cmp: inputs differ, test: false); no debug assist for these
+_BENIGN_EXITS = {
+    "grep": {1}, "egrep": {1}, "fgrep": {1}, "rg": {1},
+    "diff": {1}, "cmp": {1}, "test": {1}, "[": {1},
+}
+
+
+def _is_benign_exit(command: str, exit_code: int) -> bool:
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return False
+    return bool(argv) and exit_code in _BENIGN_EXITS.get(os.path.basename(argv[0]), ())
+
+
+# Anything the shell would interpret (pipes, redirects, expansion, quoting)
+_SHELL_META = re.compile(r"[|&;<>()$`\\\"'*?~\[\]{}#\n]")
+
+
+def _direct_argv(command: str) -> Optional[list[str]]:
+    """
+    argv for running command without /bin/sh, or None when it needs a
+    shell: metacharacters, builtins, VAR=value prefixes, unknown programs.
+    """
+    if _SHELL_META.search(command):
+        return None
+    argv = command.split()
+    if not argv or argv[0] in _SHELL_BUILTINS or "=" in argv[0]:
+        return None
+    path = shutil.which(argv[0])
+    if path is None:
+        return None
+    return [path] + argv[1:]
+
+
+def _help_text(command: str) -> str:
+    """--help output for the command's binary ("" when there is none)."""
+    try:
+        argv0 = shlex.split(command)[0]
+    except (ValueError, IndexError):  # unbalanced quotes / empty command
+        return ""
+    if argv0 in _SHELL_BUILTINS:
+        return ""
+    path = shutil.which(argv0)
+    if path is None:
+        return ""
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return ""
+    cached = _HELP_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        # argv, no shell: one exec instead of /bin/sh plus the binary
+        result = subprocess.run([path, "--help"], capture_output=True, text=True,
+                                timeout=5, stdin=subprocess.DEVNULL)
+        help_output = result.stdout + result.stderr
+    except (OSError, subprocess.TimeoutExpired):
+        help_output = ""
+    _HELP_CACHE[path] = (mtime, help_output)
+    return help_output
+
 
 def register_tools(mcp):
     """Register TermF tools with the MCP server."""
@@ -25,9 +108,12 @@ def register_tools(mcp):
 
         if run_in_bg:
             try:
+                # Plain commands are exec'd directly, saving the /bin/sh hop;
+                # anything else still goes through the shell
+                argv = _direct_argv(command)
                 proc = subprocess.Popen(
-                    command,
-                    shell=True,
+                    argv or command,
+                    shell=argv is None,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
                     stdin=subprocess.PIPE,
@@ -51,28 +137,33 @@ def register_tools(mcp):
         error_output = result.get("error", "") or ""
         
         # Format the standardized response
+        has_output = bool(output) and not output.isspace()
+        has_error = bool(error_output) and not error_output.isspace()
+        if result.get("success") and has_output and not has_error:
+            return _OK_TMPL.format(ec=exit_code, dur=duration, out=output)
+        
         status = "Success" if result.get("success") else "Failed"
-        response = f"Status: {status} (Exit Code: {exit_code})\\n"
-        response += f"Duration: {duration:.4f}s\\n"
+        parts = [f"Status: {status} (Exit Code: {exit_code})\\n",
+                 f"Duration: {duration:.4f}s\\n"]
         
-        if output.strip():
-            response += f"Output:\\n{output}\\n"
+        # isspace() tests for blank output without copying it like strip() would;
+        # the (possibly multi-MB) outputs go into parts as they are, so the
+        # join below is the only copy made of them
+        if has_output:
+            parts.extend(("Output:\\n", output, "\\n"))
         else:
-             response += "Output: [No stdout]\\n"
+            parts.append("Output: [No stdout]\\n")
 
-        if error_output.strip():
-            response += f"Error:\\n{error_output}\\n"
+        if has_error:
+            parts.extend(("Error:\\n", error_output, "\\n"))
+        response = "".join(parts)
 
-        if result.get("success"):
+        if result.get("success") or _is_benign_exit(command, exit_code):
             return response
         else:
             try:
-                from termpipe_mcp.tools.debug import analyze_and_suggest_fix
                 # Get --help output for context
-                help_command = command.split(' ')[0] + ' --help'
-                help_result = subprocess.run(help_command, shell=True, capture_output=True, text=True, timeout=5)
-                help_output = help_result.stdout + help_result.stderr
-                
+                help_output = _help_text(command)
                 suggestion = analyze_and_suggest_fix(command, error_output or "Non-zero exit code", help_output)
                 return f"{response}\\n[AI Suggestion]:{suggestion}"
             except Exception as e:
@@ -9,11 +9,12 @@ Topics:
   conduit.mcp.thread_read    — not published; read uses get() from bus store
 """
 
+import atexit
 import json
 import socket
 import os
+import time
 from pathlib import Path
-from datetime import datetime
 from termpipe_mcp.helpers import THREAD_FILE
 
 # kernclip-bus socket path
@@ -72,19 +73,75 @@ def _kc_get(topic: str) -> list[dict]:
 # Flat-file helpers (fallback)
 # ---------------------------------------------------------------------------
 
-def _file_log(entry: str):
+# O_APPEND fd kept open across thread_log calls; reopened when the file is
+# rotated or removed underneath it. O_APPEND makes each write(2) land at
+# the end even with other writers, so no buffering or locking is needed.
+_LOG_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC
+_log_fd = -1
+
+
+def _close_log():
+    global _log_fd
+    if _log_fd >= 0:
+        os.close(_log_fd)
+        _log_fd = -1
+
+
+def _get_log_fd() -> int:
+    global _log_fd
+    if _log_fd >= 0:
+        try:
+            if os.fstat(_log_fd).st_ino == os.stat(THREAD_FILE).st_ino:
+                return _log_fd
+        except FileNotFoundError:
+            pass
+        _close_log()
+    else:
+        atexit.register(_close_log)
     THREAD_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(THREAD_FILE, "a") as f:
-        f.write(entry)
+    _log_fd = os.open(THREAD_FILE, _LOG_FLAGS, 0o644)
+    return _log_fd
+
+
+# Last formatted timestamp and the second it is for: a burst of entries
+# within one second formats it once
+_last_ts: tuple[int, str] = (-1, "")
+
+
+def _timestamp() -> str:
+    global _last_ts
+    now = int(time.time())
+    if now != _last_ts[0]:
+        _last_ts = (now, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)))
+    return _last_ts[1]
+
+
+def _file_log(entry: str):
+    data = memoryview(entry.encode("utf-8"))
+    fd = _get_log_fd()
+    while data:  # a regular file takes it all in one write unless the disk fills
+        data = data[os.write(fd, data):]
 
 
 def _file_read(last_n: int) -> str:
     if not THREAD_FILE.exists():
         return "[No thread file found]"
-    lines = THREAD_FILE.read_text().strip().split("\n")
-    if last_n and len(lines) > last_n:
-        lines = lines[-last_n:]
-    return "\n".join(lines)
+    if not last_n:
+        return THREAD_FILE.read_text().strip()
+    # Read backwards in 8 KiB steps until the tail holds more than last_n
+    # line breaks (past trailing whitespace), so only the tail is decoded
+    with open(THREAD_FILE, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        while pos > 0 and tail.rstrip().count(b"\n") < last_n:
+            step = min(8192, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+    # Bytes cut mid-character at the chunk edge sit in the dropped first line
+    text = tail.decode("utf-8", errors="replace")
+    lines = (text.strip() if pos == 0 else text.rstrip()).split("\n")
+    return "\n".join(lines[-last_n:])
 
 
 # ---------------------------------------------------------------------------
@@ -108,7 +165,7 @@ def register_tools(mcp):
             sender:  Who is logging (default: MCP)
             topic:   kc-bus topic to publish on (default: conduit.mcp.thread_log)
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _timestamp()
         entry = f"\n[{timestamp}] **{sender}**: {message}\n"
 
         # Always write to flat file
@@ -2,10 +2,87 @@
 WBind GUI automation tools for TermPipe MCP Server.
 """
 
+import os
+import shutil
 import subprocess
+import time
 from pathlib import Path
+from typing import Optional
 from termpipe_mcp.helpers import HOME
 
+_WBIND_BIN = str(HOME / ".local" / "bin" / "wbind")
+_LAUNCH_DIR = HOME / ".termpipe" / "installed_apps_launch_scripts"
+
+# Launch scripts by app name, exact and lowercased, rebuilt when the
+# directory's mtime changes (i.e. a script was added, removed or renamed)
+_script_index: tuple[dict[str, str], dict[str, str]] = ({}, {})
+_script_index_mtime = -1.0
+
+
+def _launch_script(app_name: str) -> Optional[str]:
+    """Path of launch_<app_name>.sh, matched exactly or case-insensitively."""
+    global _script_index, _script_index_mtime
+    try:
+        mtime = os.stat(_LAUNCH_DIR).st_mtime
+    except OSError:
+        return None
+    if mtime != _script_index_mtime:
+        exact, lower = {}, {}
+        with os.scandir(_LAUNCH_DIR) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith("launch_") and name.endswith(".sh"):
+                    app = name[len("launch_"):-len(".sh")]
+                    exact[app] = entry.path
+                    lower.setdefault(app.lower(), entry.path)
+        _script_index, _script_index_mtime = (exact, lower), mtime
+    exact, lower = _script_index
+    return exact.get(app_name) or lower.get(app_name.lower())
+
+
+# A window-list command for whichever window manager is around; its output
+# is searched for the app name. None: no way to tell, so sleep instead.
+_WINDOW_LIST = next(
+    (cmd for cmd in (["wmctrl", "-l"], ["hyprctl", "clients", "-j"], ["swaymsg", "-t", "get_tree"])
+     if shutil.which(cmd[0])),
+    None,
+)
+
+# Backoff between window checks after a launch; adds up to the fixed 1.5s
+# wait it replaces
+_WINDOW_POLL_DELAYS = (0.025, 0.05, 0.1, 0.2, 0.4, 0.725)
+
+
+def _window_count(app_name: str) -> int:
+    """How often app_name shows up in the window list (-1 if it can't be read)."""
+    try:
+        out = subprocess.run(_WINDOW_LIST, capture_output=True, text=True, timeout=1).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return -1
+    return out.lower().count(app_name.lower())
+
+
+def _wait_for_window(app_name: str, before: int):
+    """Return once app_name has a new window, or after about 1.5s."""
+    if _WINDOW_LIST is None or before < 0:
+        time.sleep(1.5)
+        return
+    for delay in _WINDOW_POLL_DELAYS:
+        time.sleep(delay)
+        if _window_count(app_name) > before:
+            return
+
+
+def _run_wbind(actions: str, timeout: float) -> str:
+    """wbind's output for actions."""
+    result = subprocess.run(
+        [_WBIND_BIN, actions],
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+    return result.stdout or result.stderr or "[Done]"
+
 
 def register_tools(mcp):
     """Register WBind tools with the MCP server."""
@@ -27,13 +104,7 @@ def register_tools(mcp):
             actions: Comma-separated WBind actions
         """
         try:
-            result = subprocess.run(
-                [str(HOME / ".local" / "bin" / "wbind"), actions],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            return result.stdout or result.stderr or "[Done]"
+            return _run_wbind(actions, timeout=30)
         except FileNotFoundError:
             return "[Error: wbind not installed at ~/.local/bin/wbind]"
         except Exception as e:
@@ -50,28 +121,21 @@ def register_tools(mcp):
             fullscreen: Whether to make fullscreen with F11
         """
         try:
-            LAUNCH_SCRIPTS_DIR = HOME / ".termpipe" / "installed_apps_launch_scripts"
-            
             # Launch via script
-            script_path = LAUNCH_SCRIPTS_DIR / f"launch_{app_name}.sh"
-            if not script_path.exists():
-                for f in LAUNCH_SCRIPTS_DIR.glob("launch_*.sh"):
-                    if f.stem.lower() == f"launch_{app_name.lower()}":
-                        script_path = f
-                        break
-            
-            if not script_path.exists():
+            script_path = _launch_script(app_name)
+            if script_path is None:
                 return f"[Error: No launch script for '{app_name}']"
             
+            # Windows it already has, so an existing one doesn't count as launched
+            before = _window_count(app_name) if _WINDOW_LIST else -1
             subprocess.Popen(
-                ["bash", str(script_path)],
+                ["bash", script_path],
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
                 start_new_session=True
             )
             
-            import time
-            time.sleep(1.5)
+            _wait_for_window(app_name, before)
             
             actions = []
             if maximize:
@@ -80,12 +144,7 @@ def register_tools(mcp):
                 actions.append("key F11")
             
             if actions:
-                subprocess.run(
-                    [str(HOME / ".local" / "bin" / "wbind"), ",, ".join(actions)],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                _run_wbind(",, ".join(actions), timeout=10)
             
             status = f"Launched {app_name}"
             if maximize: